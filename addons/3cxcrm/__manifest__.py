@@ -25,15 +25,16 @@ by instantly accessing customer information during phone calls.
     'website': "https://www.fl1.cz",
     'support': "support@fl1.cz",
     'category': 'Productivity/VoIP',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.2.0',
     'license': 'AGPL-3',
     'depends': ['base', 'crm', 'partner_firstname'],
     'external_dependencies': {
         'python': [],
     },
     'data': [
-        # 'security/ir.model.access.csv',
+        'security/ir.model.access.csv',
         'data/data.xml',
+        'data/ir_cron.xml',
     ],
     'images': [
         'static/description/banner.png',
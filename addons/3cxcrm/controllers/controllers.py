@@ -1,11 +1,14 @@
-from odoo import http, _
-import logging
 import json
-from odoo.http import  request, Response
-from odoo.tools import date_utils
-import datetime  
+import logging
+
 from werkzeug.exceptions import BadRequest
 
+from odoo import http
+from odoo.http import request
+
+from ..tools import phone
+from ..tools.lru import MISS, caller_cache
+
 
 _logger = logging.getLogger(__name__)
 
@@ -15,115 +18,126 @@ _logger = logging.getLogger(__name__)
 class Odoo3cxCrm(http.Controller):
     @http.route('/api/3cx/crm', auth='public', csrf=False, type='json', methods=['POST'])
     def odoo_3cx_query (self, ** kw):
-        
-        token = request.env.ref('3cxcrm.token_3cx_crm').sudo().value
-        data = json.loads(request.httprequest.data) 
-        apikey = request.httprequest.headers.get('apikey')
-
-
+        error = self._3cx_auth_error()
+        if error:
+            return error
+        data = json.loads(request.httprequest.data)
         number = str(data.get('number'))
-        if apikey:
-            if not apikey == token:
-                return BadRequest('Wrong APIKEY')
+        return self._3cx_render(self._3cx_lookup(number))
+
+    @http.route('/api/3cx/crm/batch', auth='public', csrf=False, type='json', methods=['POST'])
+    def odoo_3cx_query_batch(self, **kw):
+        """Resolve a list of ``numbers`` at once, e.g. a day of call journal.
+
+        Returns ``{'results': [...]}`` with one payload per number, in input
+        order, each shaped as the ``/api/3cx/crm`` response plus ``number``.
+        """
+        error = self._3cx_auth_error()
+        if error:
+            return error
+        data = json.loads(request.httprequest.data)
+        numbers = data.get('numbers')
+        if not isinstance(numbers, list):
+            return BadRequest('numbers must be a list')
+        numbers = [str(number) for number in numbers]
+        payloads = self._3cx_lookup_many(numbers)
+        return {
+            'results': [
+                dict(self._3cx_render(payloads[number]), number=number)
+                for number in numbers
+            ],
+        }
+
+    @http.route('/api/3cx/crm/journal', auth='public', csrf=False, type='json', methods=['POST'])
+    def odoo_3cx_journal(self, **kw):
+        """Queue call journal events, e.g. ``{"number": ..., "call_type": ...}``.
+
+        Accepts a single event or ``{"events": [...]}``. Events are only
+        staged here; they are posted on the matched contact or lead by the
+        journaling cron, so the PBX webhook returns right away.
+        """
+        error = self._3cx_auth_error()
+        if error:
+            return error
+        data = json.loads(request.httprequest.data)
+        if not isinstance(data, dict):
+            return BadRequest('body must be an event or {"events": [...]}')
+        events = data.get('events', [data])
+        if not isinstance(events, list) or not all(isinstance(e, dict) for e in events):
+            return BadRequest('events must be a list of objects')
+        request.env['crm.3cx.call.event'].sudo()._3cx_enqueue(events)
+        return {'queued': len(events)}
+
+    @http.route('/api/3cx/crm/cache', auth='public', csrf=False, type='json', methods=['POST'])
+    def odoo_3cx_cache_stats(self, **kw):
+        """Hit/miss counters of the caller lookup cache of this worker."""
+        error = self._3cx_auth_error()
+        if error:
+            return error
+        return caller_cache.stats()
+
+    def _3cx_auth_error(self):
+        """Return the error response for a missing or wrong ``apikey``."""
+        apikey = request.httprequest.headers.get('apikey')
+        if not apikey:
+            return BadRequest('ApiKey not set')
+        if not request.env['crm.3cx.config']._check_3cx_apikey(apikey):
+            return BadRequest('Wrong APIKEY')
+        return None
+
+    def _3cx_lookup(self, number):
+        """Return the payload for ``number``, with ``web_url`` relative.
+
+        Full-length numbers are served from the worker's LRU cache; the models
+        drop the entries when a cached caller changes, and the entries of the
+        other workers are dropped through the cache version.
+        """
+        Lookup = request.env['crm.3cx.lookup'].sudo()
+        key = phone.suffix_key(number)
+        cache_key = (request.db, key)
+        cacheable = len(key) >= phone.SUFFIX_LENGTH
+        if cacheable:
+            Lookup._3cx_sync_cache()
+            payload = caller_cache.get(cache_key)
+            if payload is not MISS:
+                return payload
+
+        data = Lookup._3cx_resolve(number)
+        _logger.debug('3CX lookup %s resolved to %s', number, data.get('partner_id'))
+        if cacheable:
+            caller_cache.set(cache_key, data)
+        return data
+
+    def _3cx_lookup_many(self, numbers):
+        """Return ``{number: payload}`` resolving ``numbers`` set-wise.
+
+        Cached numbers are served from the LRU cache; the others are resolved
+        with one query on partners and one on leads for what is left.
+        """
+        Lookup = request.env['crm.3cx.lookup'].sudo()
+        Lookup._3cx_sync_cache()
+        result = {}
+        pending = {}
+        for number in set(numbers):
+            key = phone.suffix_key(number)
+            payload = caller_cache.get((request.db, key)) if len(key) >= phone.SUFFIX_LENGTH else MISS
+            if payload is not MISS:
+                result[number] = payload
+            elif key:
+                pending.setdefault(key, []).append(number)
             else:
-                
-                res_partner = request.env['res.partner'].with_user(1).search([('phone_mobile_search','ilike', number)],limit=1)
-                crm_lead = request.env['crm.lead'].with_user(1).search([('phone_mobile_search','ilike', number)],limit=1)
-                
-                partner_action_id = request.env.ref('contacts.action_contacts')
-                crm_action_id = request.env.ref('crm.crm_lead_all_leads')
-                
-                if res_partner:
-                    print('res_partner', res_partner)
-                    b = res_partner
-                    link = f"web#id={b.id}&model=res.partner&view_type=form&action={partner_action_id.id}"
-                    company = ""
-                    if b.company_type == "company":
-                        company = b.name
-                    else:
-                        company = ""
-                    data={
-                        'partner_id': f"{b.id}",
-                        'type' : b.type,
-                        'firstname' :  b.firstname if b.firstname else '',
-                        'lastname': b.lastname if b.lastname  else '',
-                        'mobile': b.mobile if b.mobile else '',
-                        'phone' : b.phone if b.phone else '',
-                        'email': b.email if b.email else '',
-                        'web_url': f"{request.httprequest.url_root}{link}",
-                        'company_type': b.company_type if b.company_type == "company" else '',
-                        'name': company,
-                        # 'link_end': 'link_end'
-                    }
-                    return data
-                elif crm_lead:
-                    print('crm_lead',crm_lead)
-                    b = crm_lead
-                    if b.type == 'lead':
-                        link = f"web#id={b.id}&model=crm.lead&view_type=form&action={crm_action_id.id}"
-                    elif b.type == 'opportunity':
-                        link = f"web#id={b.id}&model=crm.lead&view_type=form&action={crm_action_id.id}"
-
-                    data={
-                        'partner_id': f"L{b.id}",
-                        'type' : b.type,
-                        'name' :  b.contact_name if b.contact_name else b.name,
-                        'contact_name': b.name if b.name  else '',
-                        'mobile': b.mobile if b.mobile else '',
-                        'phone' : b.phone if b.phone else '',
-                        'web_url': f"{request.httprequest.url_root}{link}",
-                        'link_end': 'link_end'
-                    }
-                    return data
-                else:
-                    data ={"new_number": True}
-                    return data
-
-        return BadRequest('ApiKey not set')
-        
-
-    ####odoo crm.lead search lead
-    #query = request.env['crm.lead'].with_user(1).search([('phone_mobile_search','ilike', '39358')])
-
-
-
-        # dato = data.get('messages','')
-        # print(dato)
-        # for msg in dato:
-        #     date = datetime.datetime.fromtimestamp( msg.get('date','') ) 
-        #     request.env['wa.message'].sudo().create({
-        #         'id_mp': msg.get('id',''),
-        #         'messenger': msg.get('messenger',''),
-        #         'usernumber': msg.get('usernumber',''),
-        #         'date': date,
-        #         'attachment': msg.get('attachment',''),
-        #         'attachment_type': msg.get('attachment_type',''),
-        #         'text': msg.get('text',''),
-        #         'welcome': msg.get('welcome',''),
-        #         'userstatus': msg.get('userstatus',''),
-        #         'chatid': msg.get('chat_id',''),
-        #         'is_retry': msg.get('is_retry',''),
-        #         'ticket_id': msg.get('ticket_id',''),
-        #         'ticket_status': msg.get('ticket_status',''),
-        #         'agent_id': msg.get('agent_id',''),
-        #         'inbound': True,
-        #         'outbound': False
-                
-                
-        #     })
-        # sender =  msg.get('usernumber','')
-        # exist_channel = request.env['mail.channel'].sudo().search([('sender', '=', sender)])
-        # print('exist_channel',exist_channel)
-        # if exist_channel:
-        #     self.send_to_channel( msg.get('text',''), exist_channel.id)
-        # else:
-        #     aaa = self.search_sender(sender)
-            
-            
-        #     new_channel = self.channel_create( aaa+" "+sender, sender, privacy='public')
-            
-        #     self.send_to_channel( msg.get('text',''), new_channel.get('id',''))
-        #print("response", response)
-
-
-   
+                result[number] = Lookup._3cx_unknown_payload()
+
+        for key, data in Lookup._3cx_resolve_many(pending).items():
+            if len(key) >= phone.SUFFIX_LENGTH:
+                caller_cache.set((request.db, key), data)
+            for number in pending[key]:
+                result[number] = data
+        return result
+
+    def _3cx_render(self, payload):
+        """Return a copy of ``payload`` with an absolute ``web_url``."""
+        payload = dict(payload)
+        if 'web_url' in payload:
+            payload['web_url'] = f"{request.httprequest.url_root}{payload['web_url']}"
+        return payload
@@ -1,3 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from . import models
\ No newline at end of file
+from . import models
+from . import crm_3cx_call_event
+from . import crm_3cx_config
+from . import crm_3cx_lookup
+from . import phone_3cx_mixin
+from . import res_partner
+from . import crm_lead
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from markupsafe import Markup
+
+from odoo import _, api, fields, models
+
+from ..tools import phone
+
+_logger = logging.getLogger(__name__)
+
+MISSED_CALL_TYPES = ('missed', 'notanswered')
+
+
+class Crm3cxCallEvent(models.Model):
+    """Staging table for 3CX call journal events.
+
+    The journal endpoint only inserts rows here and returns; the call events
+    cron drains them in batches into chatter messages (and call-back
+    activities for missed calls) on the matched contact or lead.
+    """
+    _name = 'crm.3cx.call.event'
+    _description = '3CX call event'
+    _order = 'id'
+
+    number = fields.Char(required=True)
+    call_type = fields.Char(help='Call type as sent by 3CX: Inbound, Outbound, Missed, ...')
+    payload = fields.Text(help='Event as received, JSON encoded.')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Journaled'),
+        ('unmatched', 'Unmatched'),
+        ('error', 'Error'),
+    ], default='pending', required=True, index=True)
+    res_model = fields.Char(string='Journaled on model')
+    res_id = fields.Many2oneReference(string='Journaled on record', model_field='res_model')
+    error = fields.Text()
+
+    @api.model
+    def _3cx_enqueue(self, events):
+        """Insert the raw ``events`` and wake the journaling cron up."""
+        records = self.create([{
+            'number': str(event.get('number') or ''),
+            'call_type': event.get('call_type') or False,
+            'payload': json.dumps(event),
+        } for event in events])
+        self.env.ref('3cxcrm.ir_cron_3cx_call_events')._trigger()
+        return records
+
+    @api.model
+    def _cron_process_call_events(self, batch_size=500, keep_days=7):
+        """Journal pending events in batches, committing after each batch.
+
+        Processed events (journaled, unmatched or in error) are deleted after
+        ``keep_days``. Events in error are not retried automatically: set
+        their state back to ``pending`` to requeue them.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        while True:
+            events = self.search([('state', '=', 'pending')], limit=batch_size)
+            if not events:
+                break
+            events._3cx_journal()
+            _logger.info('3CX: journaled %d call events', len(events))
+            if not auto_commit:
+                break
+            self.env.cr.commit()
+        self.search([
+            ('state', 'in', ('done', 'unmatched', 'error')),
+            ('create_date', '<', fields.Datetime.now() - timedelta(days=keep_days)),
+        ]).unlink()
+
+    def _3cx_journal(self):
+        """Post the events of ``self`` on their caller, resolved set-wise."""
+        keys = {event: phone.suffix_key(event.number) for event in self}
+        partners = self.env['res.partner']._3cx_search_keys(keys.values())
+        leads = self.env['crm.lead']._3cx_search_keys(set(keys.values()) - set(partners))
+        for event in self:
+            target = partners.get(keys[event]) or leads.get(keys[event])
+            if not target:
+                event.state = 'unmatched'
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    event._3cx_post_on(target)
+            except Exception as e:
+                _logger.exception('3CX: failed to journal call event %s', event.id)
+                event.write({'state': 'error', 'error': str(e)})
+                continue
+            event.write({
+                'state': 'done',
+                'res_model': target._name,
+                'res_id': target.id,
+            })
+
+    def _3cx_post_on(self, target):
+        self.ensure_one()
+        event = json.loads(self.payload or '{}')
+        call_type = (self.call_type or '').lower()
+        details = [
+            _('Call type: %s', self.call_type or _('Unknown')),
+            _('Number: %s', self.number),
+        ]
+        for key, label in (('call_start', _('Start')), ('duration', _('Duration')), ('agent', _('Agent'))):
+            if event.get(key):
+                details.append(f'{label}: {event[key]}')
+        body = Markup('<p>%s</p><ul>%s</ul>') % (
+            _('3CX call'),
+            Markup().join(Markup('<li>%s</li>') % line for line in details),
+        )
+        target.message_post(body=body, subtype_xmlid='mail.mt_note')
+        if call_type in MISSED_CALL_TYPES:
+            target.activity_schedule(
+                'mail.mail_activity_data_call',
+                summary=_('Call back %s', self.number),
+                user_id=target.user_id.id or self.env.uid,
+            )
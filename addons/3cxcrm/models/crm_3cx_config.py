@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models, tools
+from odoo.tools import frozendict, str2bool
+
+TOKEN_PARAM = 'crm.3cx.auth'
+SUFFIX_INDEX_PARAM = 'crm.3cx.suffix_index'
+
+
+class Crm3cxConfig(models.AbstractModel):
+    _name = 'crm.3cx.config'
+    _description = '3CX integration configuration'
+
+    @api.model
+    @tools.ormcache()
+    def _get_3cx_config(self):
+        """Return the static configuration of the 3CX endpoints.
+
+        Cached per registry: creating, writing or deleting any
+        ``ir.config_parameter``, ``crm.3cx.auth`` included, clears the
+        registry caches of every worker, so a new API key is picked up without
+        a restart while lookups don't pay any query for it.
+        """
+        IrModelData = self.env['ir.model.data'].sudo()
+        IrConfigParameter = self.env['ir.config_parameter'].sudo()
+        return frozendict({
+            'token': IrConfigParameter.get_param(TOKEN_PARAM) or '',
+            'suffix_index': str2bool(IrConfigParameter.get_param(SUFFIX_INDEX_PARAM, 'True'), True),
+            'partner_action_id': IrModelData._xmlid_to_res_id(
+                'contacts.action_contacts', raise_if_not_found=False),
+            'lead_action_id': IrModelData._xmlid_to_res_id(
+                'crm.crm_lead_all_leads', raise_if_not_found=False),
+        })
+
+    @api.model
+    def _check_3cx_apikey(self, apikey):
+        """Compare ``apikey`` with the configured token in constant time."""
+        token = self._get_3cx_config()['token']
+        if not (apikey and token):
+            return False
+        return tools.consteq(apikey.encode(), token.encode())
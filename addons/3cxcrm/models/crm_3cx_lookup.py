@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+from odoo import SUPERUSER_ID, api, models
+from odoo.tools import SQL
+
+from ..tools import phone, suffix_index
+from ..tools.lru import caller_cache
+
+_logger = logging.getLogger(__name__)
+
+# Columns read to render a payload, in the order of the UNION branches.
+LOOKUP_COLUMNS = (
+    'id', 'type', 'firstname', 'lastname', 'name', 'contact_name',
+    'mobile', 'phone', 'email', 'is_company', 'phone_3cx_key', 'mobile_3cx_key',
+)
+# Searched in this order: a matching contact wins over a matching lead.
+LOOKUP_MODELS = ('res.partner', 'crm.lead')
+# Seconds after which a worker rebuilds its suffix index, bounding how long it
+# misses the numbers added through other workers.
+SUFFIX_INDEX_MAX_AGE = 600
+# Bumped after each commit changing a cached caller: every worker then drops
+# its cached payloads of the database.
+CACHE_VERSION_SEQUENCE = 'crm_3cx_lookup_cache_version'
+
+
+class Crm3cxLookup(models.AbstractModel):
+    """Resolve 3CX caller numbers to contact/lead payloads.
+
+    Payloads are plain dicts shaped as the ``/api/3cx/crm`` response, with
+    ``web_url`` relative to the server root so they can be cached and served
+    from any host.
+    """
+    _name = 'crm.3cx.lookup'
+    _description = '3CX caller lookup'
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL(
+            'CREATE SEQUENCE IF NOT EXISTS %s', SQL.identifier(CACHE_VERSION_SEQUENCE)))
+
+    @api.model
+    def _3cx_sync_cache(self):
+        """Drop this worker's cached payloads if callers changed since.
+
+        Costs one read of the version sequence, far cheaper than a lookup.
+        """
+        self.env.cr.execute(SQL(
+            'SELECT last_value FROM %s', SQL.identifier(CACHE_VERSION_SEQUENCE)))
+        caller_cache.sync_version(self.env.cr.dbname, self.env.cr.fetchone()[0])
+
+    @api.model
+    def _3cx_bump_cache_version(self):
+        """Make every worker drop its cached payloads at its next lookup."""
+        self.env.cr.execute(SQL(
+            'SELECT nextval(%s)', CACHE_VERSION_SEQUENCE))
+
+    @api.model
+    def _3cx_resolve(self, number):
+        """Return the payload for ``number``.
+
+        The worker's suffix index is tried first: it also matches numbers
+        stored without prefix or with a different one, and its candidates are
+        checked against the database by id. Otherwise the number is searched
+        on the indexed keys of both models with a single SQL round trip.
+        """
+        key = phone.suffix_key(number)
+        if len(key) < suffix_index.MIN_MATCH_DIGITS:
+            # Internal extension or garbage: would match arbitrary records
+            return self._3cx_unknown_payload()
+        row = self._3cx_resolve_from_index([key]).get(key)
+        if row is None:
+            rows = self._3cx_fetch_rows(
+                lambda Model: Model._3cx_keys_domain([key]), limit=1)
+            row = rows[0] if rows else None
+        if row is None:
+            return self._3cx_unknown_payload()
+        if LOOKUP_MODELS[row['priority']] == 'res.partner':
+            return self._3cx_partner_payload(row)
+        return self._3cx_lead_payload(row)
+
+    @api.model
+    def _3cx_fetch_rows(self, domain_for, limit=None):
+        """Read ``LOOKUP_COLUMNS`` of the records matching ``domain_for(Model)``.
+
+        All ``LOOKUP_MODELS`` are read in one ``UNION ALL`` of queries built
+        from the regular ORM domains (so ``active`` and the models' default
+        order still apply), ordered by model priority. ``limit`` applies per
+        model and to the whole result.
+        """
+        branches = []
+        for priority, model in enumerate(LOOKUP_MODELS):
+            Model = self.env[model].sudo()
+            domain = domain_for(Model)
+            if domain is None:
+                continue
+            Model.flush_model()
+            query = Model._search(domain, limit=limit, order=Model._order)
+            columns = [SQL('%s AS priority', priority)]
+            for fname in LOOKUP_COLUMNS:
+                field = Model._fields.get(fname)
+                if field and field.store:
+                    columns.append(SQL('%s AS %s', SQL.identifier(query.table, fname), SQL.identifier(fname)))
+                else:
+                    columns.append(SQL('NULL AS %s', SQL.identifier(fname)))
+            branches.append(SQL('(%s)', query.select(*columns)))
+        if not branches:
+            return []
+        query = SQL('%s ORDER BY priority', SQL(' UNION ALL ').join(branches))
+        if limit:
+            query = SQL('%s LIMIT %s', query, limit)
+        self.env.cr.execute(query)
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _3cx_suffix_index(self):
+        """Return this worker's suffix index, or ``None`` while unavailable.
+
+        The index is built, and rebuilt when older than
+        ``SUFFIX_INDEX_MAX_AGE``, in a background thread so that lookups never
+        wait for the scan of partners and leads; they keep using the previous
+        index, or the SQL lookup, meanwhile. Returns ``None`` as well when
+        disabled with the ``crm.3cx.suffix_index`` system parameter.
+        """
+        if not self.env['crm.3cx.config']._get_3cx_config()['suffix_index']:
+            return None
+        dbname = self.env.cr.dbname
+        index = suffix_index.indexes.get(dbname)
+        if index is None or index.age() > SUFFIX_INDEX_MAX_AGE:
+            if getattr(threading.current_thread(), 'testing', False):
+                # Test cursors can't be shared with another thread
+                index = suffix_index.indexes[dbname] = self._3cx_build_suffix_index()
+            else:
+                self._3cx_build_suffix_index_async()
+        return index
+
+    @api.model
+    def _3cx_build_suffix_index_async(self):
+        """Build the suffix index of the database in a background thread."""
+        dbname = self.env.cr.dbname
+        with suffix_index.building_lock:
+            if dbname in suffix_index.building:
+                return
+            suffix_index.building.add(dbname)
+        registry = self.env.registry
+
+        def build():
+            try:
+                with registry.cursor() as cr:
+                    Lookup = api.Environment(cr, SUPERUSER_ID, {})['crm.3cx.lookup']
+                    suffix_index.indexes[dbname] = Lookup._3cx_build_suffix_index()
+            except Exception:
+                _logger.exception('3CX: failed to build the suffix index of %s', dbname)
+            finally:
+                with suffix_index.building_lock:
+                    suffix_index.building.discard(dbname)
+
+        threading.Thread(target=build, name=f'3cx-suffix-index-{dbname}', daemon=True).start()
+
+    @api.model
+    def _3cx_build_suffix_index(self):
+        """Return a new suffix index of the keys of all ``LOOKUP_MODELS``."""
+        index = suffix_index.SuffixIndex()
+        for model in LOOKUP_MODELS:
+            Model = self.env[model].sudo()
+            key_fields = list(Model._3cx_key_fields())
+            Model.flush_model(key_fields)
+            query = Model._search(
+                ['|'] * (len(key_fields) - 1) + [(f, '!=', False) for f in key_fields])
+            self.env.cr.execute(query.select(
+                SQL.identifier(query.table, 'id'),
+                *(SQL.identifier(query.table, f) for f in key_fields),
+            ))
+            index.load(((model, res_id), keys) for res_id, *keys in self.env.cr.fetchall())
+        _logger.info('3CX: suffix index of %s built with %d records', self.env.cr.dbname, len(index))
+        return index
+
+    @api.model
+    def _3cx_resolve_from_index(self, keys):
+        """Return ``{key: row}`` for the ``keys`` matched by the suffix index.
+
+        The candidates of all keys are re-read by id in one query and their
+        current keys checked again, so entries left stale by other workers are
+        ignored. Keys without (valid) candidate are left out.
+        """
+        index = self._3cx_suffix_index()
+        if index is None:
+            return {}
+        candidates = {key: index.match(key) for key in keys}
+        ids = {}
+        for matches in candidates.values():
+            for (model, res_id), _digits in matches:
+                ids.setdefault(model, set()).add(res_id)
+        if not ids:
+            return {}
+        rows = {
+            (LOOKUP_MODELS[row['priority']], row['id']): row
+            for row in self._3cx_fetch_rows(
+                lambda Model: [('id', 'in', list(ids[Model._name]))] if Model._name in ids else None)
+        }
+        result = {}
+        for key, matches in candidates.items():
+            for ref, digits in sorted(matches, key=lambda c: (-c[1], LOOKUP_MODELS.index(c[0][0]))):
+                row = rows.get(ref)
+                if row and any(
+                    stored and stored[:digits] == key[:digits]
+                    for stored in (row['phone_3cx_key'], row['mobile_3cx_key'])
+                ):
+                    result[key] = row
+                    break
+        return result
+
+    @api.model
+    def _3cx_resolve_many(self, keys):
+        """Return ``{key: payload}`` for the suffix ``keys``.
+
+        As :meth:`_3cx_resolve`, keys are matched with the suffix index
+        first. The keys left are resolved on partners with a single query,
+        then on leads with a single query; unmatched keys get the unknown
+        payload.
+        """
+        keys = set(keys)
+        rows = self._3cx_resolve_from_index(keys)
+        keys -= set(rows)
+        partners = self.env['res.partner'].sudo()._3cx_search_keys(keys)
+        leads = self.env['crm.lead'].sudo()._3cx_search_keys(keys - set(partners))
+        result = {}
+        for key, row in rows.items():
+            if LOOKUP_MODELS[row['priority']] == 'res.partner':
+                result[key] = self._3cx_partner_payload(row)
+            else:
+                result[key] = self._3cx_lead_payload(row)
+        for key in keys:
+            if key in partners:
+                result[key] = self._3cx_partner_payload(partners[key])
+            elif key in leads:
+                result[key] = self._3cx_lead_payload(leads[key])
+            else:
+                result[key] = self._3cx_unknown_payload()
+        return result
+
+    @api.model
+    def _3cx_unknown_payload(self):
+        return {"new_number": True}
+
+    @api.model
+    def _3cx_partner_payload(self, b):
+        """Render a partner given as a record or a row of ``LOOKUP_COLUMNS``."""
+        partner_action_id = self.env['crm.3cx.config']._get_3cx_config()['partner_action_id']
+        link = f"web#id={b['id']}&model=res.partner&view_type=form&action={partner_action_id}"
+        company = b['name'] if b['is_company'] else ''
+        return {
+            'partner_id': f"{b['id']}",
+            'type': b['type'],
+            'firstname': b['firstname'] or '',
+            'lastname': b['lastname'] or '',
+            'mobile': b['mobile'] or '',
+            'phone': b['phone'] or '',
+            'email': b['email'] or '',
+            'web_url': link,
+            'company_type': 'company' if b['is_company'] else '',
+            'name': company,
+        }
+
+    @api.model
+    def _3cx_lead_payload(self, b):
+        """Render a lead given as a record or a row of ``LOOKUP_COLUMNS``."""
+        crm_action_id = self.env['crm.3cx.config']._get_3cx_config()['lead_action_id']
+        link = f"web#id={b['id']}&model=crm.lead&view_type=form&action={crm_action_id}"
+        return {
+            'partner_id': f"L{b['id']}",
+            'type': b['type'],
+            'name': b['contact_name'] or b['name'],
+            'contact_name': b['name'] or '',
+            'mobile': b['mobile'] or '',
+            'phone': b['phone'] or '',
+            'web_url': link,
+            'link_end': 'link_end',
+        }
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class CrmLead(models.Model):
+    _name = 'crm.lead'
+    _inherit = ['crm.lead', 'crm.3cx.phone.mixin']
+
+    def _3cx_key_fields(self):
+        return {'phone_3cx_key': 'phone', 'mobile_3cx_key': 'mobile'}
+
+    def _3cx_cache_fields(self):
+        return {
+            'phone', 'mobile', 'name', 'contact_name', 'type', 'active',
+        }
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+from functools import partial
+
+from odoo import SUPERUSER_ID, api, fields, models
+from odoo.osv import expression
+from odoo.tools.sql import create_index
+
+from ..tools import phone, suffix_index
+from ..tools.lru import caller_cache
+
+
+class Phone3cxMixin(models.AbstractModel):
+    """Stored, indexed suffix keys used to resolve 3CX incoming calls.
+
+    Inheriting models map each key field to the number field it is computed
+    from in :meth:`_3cx_key_fields`; the keys are then maintained by the ORM on
+    create/write and indexed with ``varchar_pattern_ops`` so that both exact
+    and prefix (``=like``) lookups use the index.
+
+    Rendered lookup payloads are cached per worker by suffix key; any change
+    to a field listed in :meth:`_3cx_cache_fields` drops the entries of the
+    records' old and new keys, and the worker's suffix index (see
+    ``crm.3cx.lookup``) is updated once the transaction commits.
+    """
+    _name = 'crm.3cx.phone.mixin'
+    _description = '3CX caller lookup keys'
+
+    phone_3cx_key = fields.Char(
+        string='Phone lookup key', compute='_compute_3cx_keys',
+        store=True, readonly=True, copy=False)
+    mobile_3cx_key = fields.Char(
+        string='Mobile lookup key', compute='_compute_3cx_keys',
+        store=True, readonly=True, copy=False)
+
+    def _3cx_key_fields(self):
+        """Return ``{key_field: number_field}`` for the indexed numbers."""
+        return {}
+
+    def _3cx_cache_fields(self):
+        """Return the fields rendered in the cached lookup payload."""
+        return set(self._3cx_key_fields().values())
+
+    @api.depends(lambda self: list(self._3cx_key_fields().values()))
+    def _compute_3cx_keys(self):
+        key_fields = self._3cx_key_fields()
+        for record in self:
+            for key_field, number_field in key_fields.items():
+                record[key_field] = phone.suffix_key(record[number_field]) or False
+
+    def init(self):
+        super().init()
+        for key_field in self._3cx_key_fields():
+            create_index(
+                self._cr, f'{self._table}_{key_field}_index', self._table,
+                [f'"{key_field}" varchar_pattern_ops'])
+
+    @api.model
+    def _3cx_keys_domain(self, keys):
+        """Return the domain matching any of the suffix ``keys``.
+
+        Full-length keys are matched exactly; shorter ones match as a suffix
+        of the number, i.e. a prefix of the reversed key. Keys shorter than
+        ``suffix_index.MIN_MATCH_DIGITS`` (internal extensions, garbage
+        numbers) match nothing.
+        """
+        exact = [key for key in keys if len(key) >= phone.SUFFIX_LENGTH]
+        partial = [
+            key for key in keys
+            if suffix_index.MIN_MATCH_DIGITS <= len(key) < phone.SUFFIX_LENGTH
+        ]
+        domain = []
+        for key_field in self._3cx_key_fields():
+            if exact:
+                domain.append((key_field, 'in', exact))
+            domain += [(key_field, '=like', f'{key}%') for key in partial]
+        if not domain:
+            return expression.FALSE_DOMAIN
+        return ['|'] * (len(domain) - 1) + domain
+
+    @api.model
+    def _3cx_lookup_domain(self, number):
+        """Return the domain matching ``number`` on the lookup keys.
+
+        Returns ``None`` when ``number`` carries no digits.
+        """
+        key = phone.suffix_key(number)
+        if not key:
+            return None
+        return self._3cx_keys_domain([key])
+
+    @api.model
+    def _3cx_search_keys(self, keys):
+        """Resolve many suffix ``keys`` with a single query.
+
+        Partial keys shorter than ``suffix_index.MIN_MATCH_DIGITS`` (internal
+        extensions, garbage numbers) are ignored: they would match a large
+        share of the records.
+
+        :return: ``{key: record}`` with, for each matched key, the first
+            record in the model's default order (as ``search(limit=1)``).
+        """
+        keys = {key for key in keys if key and len(key) >= suffix_index.MIN_MATCH_DIGITS}
+        if not keys:
+            return {}
+        exact = {key for key in keys if len(key) >= phone.SUFFIX_LENGTH}
+        partial = keys - exact
+        key_fields = list(self._3cx_key_fields())
+        matches = {}
+        for record in self.search(self._3cx_keys_domain(keys)):
+            for key_field in key_fields:
+                value = record[key_field]
+                if not value:
+                    continue
+                if value in exact:
+                    matches.setdefault(value, record)
+                for key in partial:
+                    if value.startswith(key):
+                        matches.setdefault(key, record)
+        return matches
+
+    def _3cx_invalidate_cache(self):
+        """Drop the cached payloads of the current keys of ``self``.
+
+        Entries are dropped right away and again after commit, so a lookup
+        running concurrently with this transaction can't keep the old payload.
+        After commit, the cache version is also bumped so that every worker
+        drops its payloads of the database, including those cached under
+        other keys matched by suffix.
+        """
+        key_fields = list(self._3cx_key_fields())
+        if not key_fields:
+            return
+        self._3cx_bump_cache_version_after_commit()
+        dbname = self.env.cr.dbname
+        keys = {
+            (dbname, record[key_field])
+            for record in self
+            for key_field in key_fields
+            if record[key_field]
+        }
+        if keys:
+            caller_cache.discard(keys)
+            self.env.cr.postcommit.add(partial(caller_cache.discard, keys))
+
+    def _3cx_bump_cache_version_after_commit(self):
+        """Bump the lookup cache version once, after the transaction commits."""
+        postcommit = self.env.cr.postcommit
+        if postcommit.data.get('3cxcrm.bump_cache_version'):
+            return
+        postcommit.data['3cxcrm.bump_cache_version'] = True
+        registry = self.env.registry
+
+        @postcommit.add
+        def bump_cache_version():
+            with registry.cursor() as cr:
+                api.Environment(cr, SUPERUSER_ID, {})['crm.3cx.lookup']._3cx_bump_cache_version()
+
+    def _3cx_update_index(self, removed=False):
+        """Update the worker's suffix index with ``self`` after commit."""
+        index = suffix_index.indexes.get(self.env.cr.dbname)
+        key_fields = list(self._3cx_key_fields())
+        if index is None or not key_fields:
+            return
+        changes = {
+            (record._name, record.id): (
+                [] if removed or not record.active
+                else [record[key_field] for key_field in key_fields]
+            )
+            for record in self
+        }
+
+        @self.env.cr.postcommit.add
+        def update_index():
+            for ref, keys in changes.items():
+                index.set(ref, keys)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # New numbers may have been cached as unknown callers
+        records._3cx_invalidate_cache()
+        records._3cx_update_index()
+        return records
+
+    def write(self, vals):
+        if not self._3cx_cache_fields().intersection(vals):
+            return super().write(vals)
+        self._3cx_invalidate_cache()
+        res = super().write(vals)
+        self._3cx_invalidate_cache()
+        self._3cx_update_index()
+        return res
+
+    def unlink(self):
+        self._3cx_invalidate_cache()
+        self._3cx_update_index(removed=True)
+        return super().unlink()
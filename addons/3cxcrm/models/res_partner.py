@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class ResPartner(models.Model):
+    _name = 'res.partner'
+    _inherit = ['res.partner', 'crm.3cx.phone.mixin']
+
+    def _3cx_key_fields(self):
+        return {'phone_3cx_key': 'phone', 'mobile_3cx_key': 'mobile'}
+
+    def _3cx_cache_fields(self):
+        return {
+            'phone', 'mobile', 'name', 'firstname', 'lastname', 'email',
+            'type', 'is_company', 'company_type', 'active',
+        }
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_lookup
+from . import test_lookup_benchmark
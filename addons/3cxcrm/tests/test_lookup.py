@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import BaseCase, TransactionCase, tagged
+
+from ..tools import lru, phone, suffix_index
+
+
+class TestPhone(BaseCase):
+
+    def test_normalize_number(self):
+        cases = (
+            ('+34 600 123 456', '34600123456'),
+            ('0034600123456', '34600123456'),
+            ('(600) 12-34-56', '600123456'),
+            ('600 123 456 ext. 12', '600123456'),
+            ('600123456x12', '600123456'),
+            ('600 123 456 #12', '600123456'),
+            ('', ''),
+            (None, ''),
+            ('anonymous', ''),
+        )
+        for number, normalized in cases:
+            self.assertEqual(phone.normalize_number(number), normalized, number)
+
+    def test_suffix_key(self):
+        key = '654321006'
+        for number in ('+34 600 123 456', '0034600123456', '600 123 456', '600123456 ext 3'):
+            self.assertEqual(phone.suffix_key(number), key, number)
+        self.assertEqual(phone.suffix_key('101'), '101')
+        self.assertEqual(phone.suffix_key(''), '')
+
+
+class TestLRUCache(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 0
+        self.cache = lru.LRUCache(maxsize=2, ttl=10, timer=lambda: self.now)
+
+    def test_ttl(self):
+        self.assertIs(self.cache.get(('db', 'a')), lru.MISS)
+        self.cache.set(('db', 'a'), 1)
+        self.now = 9
+        self.assertEqual(self.cache.get(('db', 'a')), 1)
+        self.now = 10
+        self.assertIs(self.cache.get(('db', 'a')), lru.MISS)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 2, 0))
+
+    def test_eviction(self):
+        self.cache.set(('db', 'a'), 1)
+        self.cache.set(('db', 'b'), 2)
+        self.cache.get(('db', 'a'))
+        self.cache.set(('db', 'c'), 3)
+        # The least recently used entry is evicted
+        self.assertIs(self.cache.get(('db', 'b')), lru.MISS)
+        self.assertEqual(self.cache.get(('db', 'a')), 1)
+        self.assertEqual(self.cache.get(('db', 'c')), 3)
+
+    def test_discard(self):
+        self.cache.set(('db', 'a'), 1)
+        self.cache.discard([('db', 'a'), ('db', 'missing')])
+        self.assertIs(self.cache.get(('db', 'a')), lru.MISS)
+
+    def test_sync_version(self):
+        self.cache.sync_version('db1', 1)
+        self.cache.set(('db1', 'a'), 1)
+        self.cache.set(('db2', 'a'), 2)
+        self.cache.sync_version('db1', 1)
+        self.assertEqual(self.cache.get(('db1', 'a')), 1)
+        # Another worker bumped the version of db1 only
+        self.cache.sync_version('db1', 2)
+        self.assertIs(self.cache.get(('db1', 'a')), lru.MISS)
+        self.assertEqual(self.cache.get(('db2', 'a')), 2)
+
+
+class TestSuffixIndex(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index = suffix_index.SuffixIndex()
+        self.index.load([
+            (('res.partner', 1), [phone.suffix_key('+34 600 123 456')]),
+            (('res.partner', 2), [phone.suffix_key('123 456')]),
+            (('crm.lead', 3), [phone.suffix_key('0034 600 123 456'), False]),
+            (('res.partner', 4), [phone.suffix_key('+34 911 222 333')]),
+        ])
+
+    def test_match_ranking(self):
+        matches = self.index.match(phone.suffix_key('+34 600 123 456'))
+        self.assertEqual(sorted(matches[:2]), [(('crm.lead', 3), 9), (('res.partner', 1), 9)])
+        # The stored number shorter than the caller's ranks last
+        self.assertEqual(matches[2:], [(('res.partner', 2), 6)])
+
+    def test_match_caller_shorter(self):
+        matches = dict(self.index.match(phone.suffix_key('0 123 456')))
+        self.assertEqual(
+            matches, {('res.partner', 1): 7, ('crm.lead', 3): 7, ('res.partner', 2): 6})
+
+    def test_match_too_short(self):
+        self.assertEqual(self.index.match(phone.suffix_key('23 456')), [])
+
+    def test_match_limit(self):
+        self.assertEqual(len(self.index.match(phone.suffix_key('600 123 456'), limit=1)), 1)
+
+    def test_set_and_discard(self):
+        key = phone.suffix_key('+34 911 222 333')
+        self.index.set(('res.partner', 4), [phone.suffix_key('+34 922 000 111')])
+        self.assertEqual(self.index.match(key), [])
+        self.index.set(('res.partner', 5), [key])
+        self.assertEqual(self.index.match(key), [(('res.partner', 5), 9)])
+        self.index.discard(('res.partner', 5))
+        self.assertEqual(self.index.match(key), [])
+        self.assertEqual(self.index._keys, sorted(self.index._keys))
+
+
+@tagged('post_install', '-at_install')
+class TestLookup(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner = cls.env['res.partner'].create({
+            'name': 'Petër Flanker',
+            'phone': '+34 600 123 456',
+        })
+        cls.partner_mobile = cls.env['res.partner'].create({
+            'name': 'Mönty Flanker',
+            'mobile': '0034 611 222 333',
+        })
+        cls.lead = cls.env['crm.lead'].create({
+            'name': 'Flanker lead',
+            'contact_name': 'Lead Contact',
+            'phone': '+34 622 333 444',
+        })
+
+    def test_search_keys(self):
+        keys = {
+            phone.suffix_key('600 123 456'): self.partner,
+            phone.suffix_key('+34 611 222 333 ext. 5'): self.partner_mobile,
+            # Partial key: the stored number ends with it
+            phone.suffix_key('0 123 456'): self.partner,
+        }
+        ignored = {
+            phone.suffix_key('101'),
+            phone.suffix_key('23 456'),
+            phone.suffix_key('+34 699 999 999'),
+        }
+        self.assertEqual(
+            self.env['res.partner']._3cx_search_keys(set(keys) | ignored), keys)
+
+    def test_resolve(self):
+        Lookup = self.env['crm.3cx.lookup']
+        payload = Lookup._3cx_resolve('0034 600 123 456')
+        self.assertEqual(payload['partner_id'], str(self.partner.id))
+        payload = Lookup._3cx_resolve('622 333 444')
+        self.assertEqual(payload['partner_id'], f'L{self.lead.id}')
+        for number in ('101', '+34 699 999 999', ''):
+            self.assertEqual(Lookup._3cx_resolve(number), {'new_number': True}, number)
+
+    def test_resolve_many(self):
+        keys = [phone.suffix_key(n) for n in ('600 123 456', '622 333 444', '101')]
+        result = self.env['crm.3cx.lookup']._3cx_resolve_many(keys)
+        self.assertEqual(result[keys[0]]['partner_id'], str(self.partner.id))
+        self.assertEqual(result[keys[1]]['partner_id'], f'L{self.lead.id}')
+        self.assertEqual(result[keys[2]], {'new_number': True})
+
+    def test_journal(self):
+        events = self.env['crm.3cx.call.event']._3cx_enqueue([
+            {'number': '+34 600 123 456', 'call_type': 'Inbound', 'duration': '00:01:02'},
+            {'number': '622 333 444', 'call_type': 'Missed'},
+            {'number': '101', 'call_type': 'Inbound'},
+        ])
+        events._3cx_journal()
+        self.assertEqual(events.mapped('state'), ['done', 'done', 'unmatched'])
+        self.assertEqual(
+            [(event.res_model, event.res_id) for event in events[:2]],
+            [('res.partner', self.partner.id), ('crm.lead', self.lead.id)],
+        )
+        self.assertIn('00:01:02', self.partner.message_ids[0].body)
+        # Missed calls get a call-back activity
+        self.assertFalse(self.partner.activity_ids)
+        self.assertEqual(
+            self.lead.activity_ids.activity_type_id,
+            self.env.ref('mail.mail_activity_data_call'),
+        )
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""Latency and throughput benchmark of the 3CX caller lookup.
+
+Not part of the standard test run; run it against a local database with::
+
+    odoo-bin -d bench -i 3cxcrm --test-tags /3cxcrm:3cx_benchmark --stop-after-init
+
+Volumes and thresholds are read from the environment:
+
+* ``BENCH_3CX_PARTNERS`` / ``BENCH_3CX_LEADS``: seeded records (2000 each)
+* ``BENCH_3CX_REQUESTS``: lookups fired (400)
+* ``BENCH_3CX_CONCURRENCY``: parallel clients (4, the ``MaxConcurrentRequests``
+  of the PBX template)
+* ``BENCH_3CX_P99_MS``: fail when the p99 latency exceeds it (unset: report only)
+
+The HTTP test server shares a single database cursor between requests, so
+concurrent lookups are serialized on the database side: figures are meant for
+comparison between runs, not as production capacity.
+"""
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo.tests import HttpCase, tagged
+
+from ..tools import phone
+
+_logger = logging.getLogger(__name__)
+
+PHONE_FORMATS = (
+    '+34 {a}{b} {c} {d}',
+    '0034{a}{b}{c}{d}',
+    '{a} {b} {c} {d}',
+    '({a}) {b}-{c}-{d}',
+    '+34{a}{b}{c}{d} ext. 12',
+)
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+@tagged('post_install', '-at_install', '-standard', '3cx_benchmark')
+class TestLookupBenchmark(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.random = random.Random(3)
+        cls.token = 'bench-3cx-token'
+        cls.env['ir.config_parameter'].sudo().set_param('crm.3cx.auth', cls.token)
+        n_partners = _env_int('BENCH_3CX_PARTNERS', 2000)
+        n_leads = _env_int('BENCH_3CX_LEADS', 2000)
+        started = time.perf_counter()
+        cls.partner_numbers = cls._seed('res.partner', n_partners, lambda i: {
+            'firstname': f'Bench{i}',
+            'lastname': 'Caller',
+        })
+        cls.lead_numbers = cls._seed('crm.lead', n_leads, lambda i: {
+            'name': f'Bench lead {i}',
+            'contact_name': f'Bench contact {i}',
+        })
+        _logger.info(
+            '3CX benchmark: seeded %d partners and %d leads in %.1fs',
+            n_partners, n_leads, time.perf_counter() - started)
+
+    @classmethod
+    def _seed(cls, model, count, values, batch_size=1000):
+        numbers = []
+        for start in range(0, count, batch_size):
+            vals_list = []
+            for i in range(start, min(start + batch_size, count)):
+                number = cls._random_number()
+                numbers.append(number)
+                vals_list.append(dict(values(i), mobile=number, phone=cls._random_number()))
+            cls.env[model].create(vals_list)
+        return numbers
+
+    @classmethod
+    def _random_number(cls):
+        digits = f'6{cls.random.randrange(10 ** 8):08d}'
+        return cls.random.choice(PHONE_FORMATS).format(
+            a=digits[:3], b=digits[3:5], c=digits[5:7], d=digits[7:])
+
+    def _sample_numbers(self, count):
+        """Mix of known partners, known leads and unknown callers."""
+        pool = self.partner_numbers + self.lead_numbers
+        unknown = [f'+1 555 {i:07d}' for i in range(count // 10)]
+        sample = [self.random.choice(pool) for _i in range(count - len(unknown))]
+        sample += unknown
+        self.random.shuffle(sample)
+        return sample
+
+    def _lookup(self, number):
+        started = time.perf_counter()
+        response = self.url_open(
+            '/api/3cx/crm',
+            data=json.dumps({'number': number}),
+            headers={'Content-Type': 'application/json', 'apikey': self.token},
+        )
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        return elapsed, response.json()['result']
+
+    def test_lookup_query_count(self):
+        """A cache miss costs a single query once the configuration is warm."""
+        Lookup = self.env['crm.3cx.lookup'].sudo()
+        Lookup._3cx_resolve(self.partner_numbers[0])
+        for number in (self.partner_numbers[1], self.lead_numbers[0], '+1 555 0000000'):
+            with self.assertQueryCount(1):
+                Lookup._3cx_resolve(number)
+
+    def test_lookup_latency(self):
+        requests = _env_int('BENCH_3CX_REQUESTS', 400)
+        concurrency = _env_int('BENCH_3CX_CONCURRENCY', 4)
+        numbers = self._sample_numbers(requests)
+        self._lookup(numbers[0])  # warm up routing and configuration caches
+
+        queries_before = self.cr.sql_log_count
+        for number in numbers[:50]:
+            self._lookup(number)
+        queries_per_request = (self.cr.sql_log_count - queries_before) / 50
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(self._lookup, numbers))
+        wall = time.perf_counter() - started
+
+        latencies = sorted(elapsed * 1000 for elapsed, _result in results)
+        percentiles = statistics.quantiles(latencies, n=100)
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+        _logger.info(
+            '3CX benchmark: %d lookups, concurrency %d: p50 %.1fms, p95 %.1fms, '
+            'p99 %.1fms, %.1f queries/request, %.1f requests/s',
+            requests, concurrency, p50, p95, p99, queries_per_request,
+            requests / wall)
+
+        known = {phone.suffix_key(number) for number in self.partner_numbers + self.lead_numbers}
+        for number, (_elapsed, result) in zip(numbers, results):
+            self.assertEqual(
+                'new_number' in result, phone.suffix_key(number) not in known,
+                f'Wrong lookup result for {number}')
+
+        max_p99 = os.environ.get('BENCH_3CX_P99_MS')
+        if max_p99:
+            self.assertLessEqual(p99, float(max_p99), 'p99 lookup latency regressed')
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from . import lru
+from . import phone
+from . import suffix_index
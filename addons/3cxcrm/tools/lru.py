@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Bounded, TTL-aware LRU cache for rendered caller lookup payloads."""
+import threading
+import time
+from collections import OrderedDict
+
+MISS = object()
+
+
+class LRUCache:
+    """Thread-safe LRU mapping whose entries expire after ``ttl`` seconds.
+
+    The cache lives in the worker process: entries are dropped explicitly by
+    the models when a cached caller changes. Keys are ``(namespace, ...)``
+    tuples; :meth:`sync_version` drops a whole namespace when its version
+    (shared by all workers, e.g. stored in the database) has moved, which is
+    how changes made by other workers are picked up.
+    """
+
+    def __init__(self, maxsize=4096, ttl=300, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Return the value cached for ``key``, or :data:`MISS`."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self.timer():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return MISS
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self.timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, keys):
+        """Drop every key of ``keys`` present in the cache."""
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def sync_version(self, namespace, version):
+        """Drop the entries of ``namespace`` if ``version`` differs from the
+        last one seen for it."""
+        with self._lock:
+            if self._versions.get(namespace) == version:
+                return
+            self._versions[namespace] = version
+            for key in [key for key in self._data if key[0] == namespace]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._versions.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Rendered payloads keyed by ``(dbname, suffix key)``.
+caller_cache = LRUCache()
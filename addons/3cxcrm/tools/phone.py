@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Phone number normalization used by the 3CX caller lookup.
+
+Numbers are stored and searched as a *suffix key*: the trailing significant
+digits of the E.164 number, reversed. Reversing turns a suffix match into a
+prefix match, which a B-tree index can serve, and limiting the key to the
+trailing digits makes ``+34 600 123 456``, ``0034600123456`` and
+``600 123 456`` resolve to the same key.
+"""
+import re
+
+# Trailing digits kept in the key. Nine digits cover the national significant
+# number of most numbering plans we receive calls from.
+SUFFIX_LENGTH = 9
+
+_EXTENSION_RE = re.compile(r'\s*(?:ext\.?|extension|x|#)\s*\d+\s*$', re.IGNORECASE)
+_NON_DIGIT_RE = re.compile(r'\D')
+
+
+def normalize_number(number):
+    """Return ``number`` as a digits-only E.164 string, without ``+``.
+
+    Extensions are dropped and the ``00`` international prefix is treated as
+    ``+``. Returns an empty string when there are no digits.
+    """
+    if not number:
+        return ''
+    number = _EXTENSION_RE.sub('', str(number))
+    digits = _NON_DIGIT_RE.sub('', number)
+    if digits.startswith('00'):
+        digits = digits[2:]
+    return digits
+
+
+def suffix_key(number):
+    """Return the reversed trailing significant digits of ``number``."""
+    return normalize_number(number)[-SUFFIX_LENGTH:][::-1]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""In-memory suffix index of the caller lookup keys.
+
+Keys are the reversed trailing digits computed by :func:`.phone.suffix_key`,
+so "number A ends with number B" becomes "key A starts with key B": a caller
+key is matched against the indexed keys with one dict probe per digit (indexed
+numbers that are a suffix of the caller's) and one bisection in the sorted key
+list (indexed numbers the caller's is a suffix of).
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+# Shortest common suffix accepted as a match.
+MIN_MATCH_DIGITS = 6
+
+
+class SuffixIndex:
+    """Thread-safe ``key -> refs`` index supporting suffix matches.
+
+    A ref identifies a record, e.g. ``('res.partner', 42)``; a record may be
+    indexed under several keys (phone and mobile).
+    """
+
+    def __init__(self, timer=time.monotonic):
+        self.timer = timer
+        self.built_at = timer()
+        self._keys = []
+        self._refs = {}
+        self._ref_keys = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ref_keys)
+
+    def age(self):
+        return self.timer() - self.built_at
+
+    def set(self, ref, keys):
+        """Index ``ref`` under ``keys`` only, replacing its previous keys."""
+        keys = {key for key in keys if key}
+        with self._lock:
+            self._discard(ref)
+            if not keys:
+                return
+            self._ref_keys[ref] = keys
+            for key in keys:
+                refs = self._refs.get(key)
+                if refs is None:
+                    refs = self._refs[key] = set()
+                    insort(self._keys, key)
+                refs.add(ref)
+
+    def load(self, items):
+        """Index ``(ref, keys)`` pairs in bulk, sorting the keys only once.
+
+        Meant to fill a new index; :meth:`set` keeps the sorted key list up to
+        date incrementally, which is quadratic when loading many records.
+        """
+        with self._lock:
+            for ref, keys in items:
+                keys = {key for key in keys if key}
+                self._discard(ref)
+                if not keys:
+                    continue
+                self._ref_keys[ref] = keys
+                for key in keys:
+                    self._refs.setdefault(key, set()).add(ref)
+            self._keys = sorted(self._refs)
+
+    def discard(self, ref):
+        with self._lock:
+            self._discard(ref)
+
+    def _discard(self, ref):
+        for key in self._ref_keys.pop(ref, ()):
+            refs = self._refs[key]
+            refs.discard(ref)
+            if not refs:
+                del self._refs[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+    def match(self, key, limit=5):
+        """Return up to ``limit`` ``(ref, digits)`` sharing a suffix with ``key``.
+
+        ``digits`` is the length of the common suffix; results are ranked by
+        it, longest first.
+        """
+        if len(key) < MIN_MATCH_DIGITS:
+            return []
+        found = {}
+        with self._lock:
+            # Indexed numbers ending the caller's number, longest first
+            for digits in range(len(key), MIN_MATCH_DIGITS - 1, -1):
+                for ref in self._refs.get(key[:digits], ()):
+                    found.setdefault(ref, digits)
+            # Indexed numbers the caller's number ends
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and len(found) < limit and self._keys[i].startswith(key):
+                for ref in self._refs[self._keys[i]]:
+                    found.setdefault(ref, len(key))
+                i += 1
+        ranked = sorted(found.items(), key=lambda item: -item[1])
+        return ranked[:limit]
+
+
+# Indexes of this process, by database name.
+indexes = {}
+# Databases whose index is being built by this process.
+building = set()
+building_lock = threading.Lock()
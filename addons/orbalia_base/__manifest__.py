@@ -1,6 +1,6 @@
 {
     'name': 'Orbalia Base',
-    'version': '1.0.2',
+    'version': '1.0.4',
     'summary': 'Base de Orbalia (subvenciones con etapas configurables)',
     'category': 'Tools',
     'license': 'LGPL-3',
@@ -11,6 +11,7 @@
         # DATA
         'data/sequence.xml',
         'data/grant_state_data.xml',
+        'data/ir_cron.xml',
         # (opcional) etapas por defecto:
         #'data/project_stage_data.xml',
 
@@ -20,6 +21,9 @@
         'views/project_views.xml',
         'views/project_grant_views.xml',
         'views/project_kanban.xml',
+        'views/project_code_gap_views.xml',
+        'views/project_stage_move_views.xml',
+        'views/project_report_views.xml',
         'views/res_partner_views.xml',
     ],
         'assets': {
@@ -4,3 +4,6 @@ from . import project_grant_fields
 from . import project_stage
 from . import grant_call
 from . import grant_state
+from . import project_code_gap
+from . import project_stage_move
+from . import project_report
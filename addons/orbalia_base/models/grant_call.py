@@ -65,15 +65,23 @@ class OrbaliaGrantCall(models.Model):
     )
 
     project_ids = fields.One2many("orbalia.project", "grant_call_id", string="Expedientes")
-    project_count = fields.Integer(compute="_compute_project_count", string="Nº expedientes")
+    project_count = fields.Integer(
+        compute="_compute_project_count", string="Nº expedientes", store=True
+    )
 
     # ----------------------------------------------------------
     # Cómputos
     # ----------------------------------------------------------
     @api.depends('project_ids')
     def _compute_project_count(self):
+        """Almacenado: el ORM lo recalcula solo para las convocatorias cuyos
+        expedientes se crean, cambian de convocatoria o se borran, con una
+        única consulta agrupada por lote."""
+        counts = dict(self.env['orbalia.project'].sudo()._read_group(
+            [('grant_call_id', 'in', self._origin.ids)], ['grant_call_id'], ['__count'],
+        ))
         for rec in self:
-            rec.project_count = len(rec.project_ids)
+            rec.project_count = counts.get(rec._origin, 0)
 
     # --- Sincronización estado <-> etapa Kanban ---
     @api.depends('estado')
@@ -161,8 +169,11 @@ class OrbaliaGrantCall(models.Model):
     # ----------------------------------------------------------
     def unlink(self):
         for rec in self:
-            if rec.project_ids:
+            if rec.project_count:
                 raise ValidationError(_(
                     "No se puede eliminar la subvención '%s' porque tiene %d expedientes asociados."
-                ) % (rec.display_name, len(rec.project_ids)))
-        return super().unlink()
+                ) % (rec.display_name, rec.project_count))
+        res = super().unlink()
+        # Sus etapas se borran en cascada desde la base de datos
+        self.env['orbalia.project.stage']._invalidate_stage_ids_cache()
+        return res
@@ -1,6 +1,24 @@
 # -*- coding: utf-8 -*-
+import threading
+from collections import deque
+
+from markupsafe import Markup
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError  # por si lo usas en otras partes
+from odoo.tools import SQL
+
+from .project_report import REPORT_FIELDS
+
+# Reparto de códigos de expediente: 'sequence' o 'block'
+CODE_ALLOCATION_PARAM = 'orbalia_base.code_allocation'
+CODE_BLOCK_SIZE_PARAM = 'orbalia_base.code_block_size'
+CODE_BLOCK_SIZE = 50
+
+# Bloques de códigos reservados por este proceso, por (bd, secuencia, prefijo, sufijo)
+_code_blocks = {}
+_code_blocks_lock = threading.Lock()
+
 
 class OrbaliaProject(models.Model):
     _name = "orbalia.project"
@@ -181,9 +199,9 @@ class OrbaliaProject(models.Model):
         if not gc_ids:
             return stages.browse()
 
-        # 4) Etapas activas de esas convocatorias, orden estable
-        dom = [('active', '=', True), ('grant_call_id', 'in', list(gc_ids))]
-        return stages.search(dom, order="grant_call_id, sequence, id")
+        # 4) Etapas activas de esas convocatorias, orden estable (cacheado)
+        stage_ids = stages._stage_ids_for_calls(tuple(sorted(gc_ids)))
+        return stages.browse(stage_ids)
 
     @api.depends('stage_id')
     def _compute_etapa_display(self):
@@ -193,34 +211,201 @@ class OrbaliaProject(models.Model):
     # -----------------------
     # OVERRIDES PARA TRAZABILIDAD
     # -----------------------
-    @api.model
-    def create(self, vals):
-        # Inicializamos trazabilidad en creación
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Códigos reservados de una vez para todo el lote
+        if 'default_name' not in self.env.context:
+            unnamed = [vals for vals in vals_list if not vals.get('name')]
+            for vals, code in zip(unnamed, self._reserve_codes(len(unnamed))):
+                vals['name'] = code
+
+        # Inicializamos trazabilidad en creación, con una sola marca de tiempo
         now = fields.Datetime.now()
-        vals.setdefault('last_change_user_id', self.env.user.id)
-        vals.setdefault('last_change_date', now)
-        # Si viene etapa en la creación, registramos también trazabilidad de etapa
-        if vals.get('stage_id'):
-            vals.setdefault('last_stage_user_id', self.env.user.id)
-            vals.setdefault('last_stage_date', now)
-        record = super().create(vals)
-        return record
+        user_id = self.env.user.id
+        for vals in vals_list:
+            vals.setdefault('last_change_user_id', user_id)
+            vals.setdefault('last_change_date', now)
+            # Si viene etapa en la creación, registramos también trazabilidad de etapa
+            if vals.get('stage_id'):
+                vals.setdefault('last_stage_user_id', user_id)
+                vals.setdefault('last_stage_date', now)
+        records = super().create(vals_list)
+        self.env['orbalia.project.report']._schedule_refresh()
+        return records
+
+    @api.model
+    def _reserve_codes(self, count):
+        """Reserva ``count`` códigos de la secuencia ``orbalia.grant``.
+
+        Según el parámetro ``orbalia_base.code_allocation``:
+          - ``sequence`` (por defecto): avanza la secuencia una vez para todo
+            el lote, con la implementación configurada en ella.
+          - ``block``: reparte códigos de un bloque reservado por el proceso en
+            una transacción propia, sin bloquear la secuencia hasta el commit.
+            Los códigos no usados quedan como huecos (ver informe de huecos).
+        """
+        if not count:
+            return []
+        seq = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'orbalia.grant'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not seq:
+            return ['/'] * count
+        if seq.use_date_range:
+            # Los tramos por fecha los gestiona ir.sequence
+            return [seq._next() for _i in range(count)]
+        params = self.env['ir.config_parameter'].sudo()
+        if params.get_param(CODE_ALLOCATION_PARAM, 'sequence') == 'block':
+            block_size = int(params.get_param(CODE_BLOCK_SIZE_PARAM, CODE_BLOCK_SIZE))
+            return self._reserve_codes_from_block(seq, count, block_size)
+        return [seq.get_next_char(number) for number in self._advance_sequence(seq, count)]
+
+    @api.model
+    def _reserve_codes_from_block(self, seq, count, block_size):
+        prefix, suffix = seq._get_prefix_suffix()
+        # Cambiar de año (prefijo) descarta lo que quedase del bloque anterior
+        key = (self.env.cr.dbname, seq.id, prefix, suffix)
+        with _code_blocks_lock:
+            pool = _code_blocks.get(key)
+            if pool is None:
+                for stale in [k for k in _code_blocks if k[:2] == key[:2]]:
+                    del _code_blocks[stale]
+                pool = _code_blocks[key] = deque()
+            if len(pool) < count:
+                with self.env.registry.cursor() as cr:
+                    block_seq = seq.with_env(seq.env(cr=cr))
+                    numbers = self._advance_sequence(block_seq, max(block_size, count - len(pool)))
+                # El bloque se confirma aparte: number_next en caché queda obsoleto
+                seq.invalidate_recordset(['number_next'])
+                pool.extend(seq.get_next_char(number) for number in numbers)
+            return [pool.popleft() for _i in range(count)]
+
+    @api.model
+    def _advance_sequence(self, seq, count):
+        """Avanza ``seq`` ``count`` posiciones con una sola consulta y devuelve
+        los números reservados."""
+        cr = seq.env.cr
+        if seq.implementation == 'standard':
+            cr.execute(SQL(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                'ir_sequence_%03d' % seq.id, count,
+            ))
+            return [row[0] for row in cr.fetchall()]
+        # no_gap: un único bloqueo y avance de number_next para el lote
+        step = seq.number_increment
+        seq.flush_recordset(['number_next'])
+        cr.execute(SQL(
+            "UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s RETURNING number_next",
+            step * count, seq.id,
+        ))
+        end = cr.fetchone()[0]
+        seq.invalidate_recordset(['number_next'])
+        return range(end - step * count, end, step)
 
     def write(self, vals):
         """
         Actualiza:
           - last_stage_user_id / last_stage_date si cambia la etapa.
           - last_change_user_id / last_change_date ante cualquier modificación real.
+
+        Los registros en los que ``vals`` no cambia nada no se escriben, y la
+        trazabilidad de etapa solo se registra en los que cambian de etapa.
         """
-        now = fields.Datetime.now()
-        stage_changed = 'stage_id' in vals and vals.get('stage_id') is not None
+        changed = self._filter_changed(vals)
+        if not changed:
+            return True
+
+        if REPORT_FIELDS & set(vals):
+            self.env['orbalia.project.report']._schedule_refresh()
 
-        # Siempre que se escribe, hay modificación: registramos usuario/fecha.
+        now = fields.Datetime.now()
+        vals = dict(vals)
         vals.setdefault('last_change_user_id', self.env.user.id)
         vals.setdefault('last_change_date', now)
 
-        if stage_changed:
-            vals.setdefault('last_stage_user_id', self.env.user.id)
-            vals.setdefault('last_stage_date', now)
+        moved = changed.browse()
+        if 'stage_id' in vals and vals.get('stage_id') is not None:
+            stage_id = self._fields['stage_id'].convert_to_cache(vals['stage_id'], self, validate=False)
+            moved = changed.filtered(lambda rec: rec.stage_id.id != stage_id)
+        if not moved:
+            return super(OrbaliaProject, changed).write(vals)
+
+        stage_vals = dict(vals)
+        stage_vals.setdefault('last_stage_user_id', self.env.user.id)
+        stage_vals.setdefault('last_stage_date', now)
+        res = super(OrbaliaProject, moved).write(stage_vals)
+        if changed - moved:
+            res = super(OrbaliaProject, changed - moved).write(vals) and res
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['orbalia.project.report']._schedule_refresh()
+        return res
+
+    def _filter_changed(self, vals):
+        """Registros en los que ``vals`` cambia algún valor almacenado.
+
+        Los campos relacionales *2many o no almacenados se consideran siempre
+        cambios, ya que no se pueden comparar de forma fiable.
+        """
+        changed_ids = set()
+        for fname, value in vals.items():
+            field = self._fields.get(fname)
+            if field is None or not field.store or field.type in ('one2many', 'many2many'):
+                return self
+            for rec in self:
+                if rec.id in changed_ids:
+                    continue
+                new = field.convert_to_cache(value, rec, validate=False)
+                old = field.convert_to_cache(rec[fname], rec, validate=False)
+                if field.type in ('char', 'text', 'html'):
+                    # El cliente envía '' o False indistintamente para un texto vacío
+                    new, old = new or None, old or None
+                if new != old:
+                    changed_ids.add(rec.id)
+            if len(changed_ids) == len(self):
+                break
+        return self.filtered(lambda rec: rec.id in changed_ids)
+
+    # -----------------------
+    # MOVIMIENTO MASIVO DE ETAPA
+    # -----------------------
+    def move_to_stage(self, stage_id):
+        """Mueve los expedientes a la etapa ``stage_id`` con una sola escritura.
+
+        El seguimiento de ``stage_id`` se sustituye por una nota por expediente
+        movido, creadas todas de una vez. Pensado para acciones de lista y RPC:
+        devuelve el número de expedientes movidos y los contadores de las
+        columnas de la convocatoria de la etapa.
+        """
+        stage = self.env['orbalia.project.stage'].browse(stage_id).exists()
+        if not stage:
+            raise ValidationError(_("La etapa indicada no existe."))
+        others = self.filtered(lambda rec: rec.grant_call_id != stage.grant_call_id)
+        if others:
+            raise ValidationError(_(
+                "La etapa '%s' no pertenece a la convocatoria de %d de los expedientes."
+            ) % (stage.display_name, len(others)))
+
+        moved = self.filtered(lambda rec: rec.stage_id != stage)
+        bodies = {
+            rec.id: Markup("%s: %s &rarr; %s") % (_("Etapa"), rec.stage_id.name or '', stage.name)
+            for rec in moved
+        }
+        if moved:
+            moved.with_context(tracking_disable=True).write({'stage_id': stage.id})
+            moved._message_log_batch(bodies=bodies)
 
-        return super().write(vals)
+        counts = dict(self._read_group(
+            [('grant_call_id', '=', stage.grant_call_id.id)], ['stage_id'], ['__count'],
+        ))
+        stages = stage.browse(stage._stage_ids_for_calls((stage.grant_call_id.id,)))
+        return {
+            'moved': len(moved),
+            'columns': [
+                {'stage_id': column.id, 'name': column.name, 'count': counts.get(column, 0)}
+                for column in stages
+            ],
+        }
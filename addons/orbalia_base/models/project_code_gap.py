@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, tools
+from odoo.tools import SQL
+
+
+class OrbaliaProjectCodeGap(models.Model):
+    """Huecos en la numeración de los códigos de expediente, para auditoría.
+
+    Los modos de reparto sin bloqueo (secuencia estándar o por bloques) pueden
+    dejar números sin usar cuando una transacción se deshace o un proceso se
+    reinicia con códigos reservados.
+    """
+    _name = 'orbalia.project.code.gap'
+    _description = 'Hueco en códigos de expediente'
+    _auto = False
+    _order = 'prefix, gap_start'
+
+    prefix = fields.Char(string='Prefijo', readonly=True)
+    gap_start = fields.Integer(string='Desde', readonly=True)
+    gap_end = fields.Integer(string='Hasta', readonly=True)
+    missing_count = fields.Integer(string='Códigos sin usar', readonly=True)
+    previous_code = fields.Char(string='Código anterior', readonly=True)
+    next_code = fields.Char(string='Código siguiente', readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL("""
+            CREATE OR REPLACE VIEW %s AS (
+                SELECT
+                    row_number() OVER (ORDER BY prefix, number) AS id,
+                    prefix,
+                    previous_number + 1 AS gap_start,
+                    number - 1 AS gap_end,
+                    number - previous_number - 1 AS missing_count,
+                    previous_code,
+                    code AS next_code
+                FROM (
+                    SELECT
+                        prefix,
+                        number,
+                        code,
+                        lag(number) OVER w AS previous_number,
+                        lag(code) OVER w AS previous_code
+                    FROM (
+                        SELECT
+                            substring(name FROM '^(.*?)[0-9]+$') AS prefix,
+                            substring(name FROM '([0-9]+)$')::bigint AS number,
+                            name AS code
+                        FROM orbalia_project
+                        WHERE name ~ '[0-9]+$'
+                    ) AS codes
+                    WINDOW w AS (PARTITION BY prefix ORDER BY number)
+                ) AS numbered
+                WHERE number - previous_number > 1
+            )
+        """, SQL.identifier(self._table)))
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+# Campos de orbalia.project que alteran las estadísticas
+REPORT_FIELDS = {
+    'grant_call_id', 'stage_id', 'state', 'company_id',
+    'importe_solicitado', 'importe_concedido',
+}
+
+
+class OrbaliaProjectReport(models.Model):
+    """Estadísticas de expedientes por convocatoria y etapa.
+
+    Se leen de una vista materializada; la acción planificada la refresca
+    periódicamente y en cuanto se crean, modifican o borran expedientes.
+    """
+    _name = 'orbalia.project.report'
+    _description = 'Estadísticas de expedientes'
+    _auto = False
+    _order = 'grant_call_id, stage_id'
+
+    grant_call_id = fields.Many2one('orbalia.grant.call', string='Subvención', readonly=True)
+    stage_id = fields.Many2one('orbalia.project.stage', string='Etapa', readonly=True)
+    company_id = fields.Many2one('res.company', string='Compañía', readonly=True)
+    company_currency_id = fields.Many2one('res.currency', string='Moneda de compañía', readonly=True)
+
+    project_count = fields.Integer(string='Nº expedientes', readonly=True)
+    draft_count = fields.Integer(string='Borrador', readonly=True)
+    submitted_count = fields.Integer(string='Presentadas', readonly=True)
+    awarded_count = fields.Integer(string='Concedidas', readonly=True)
+    rejected_count = fields.Integer(string='Rechazadas', readonly=True)
+    cancel_count = fields.Integer(string='Canceladas', readonly=True)
+    resolved_count = fields.Integer(
+        string='Resueltas', readonly=True, help='Concedidas + rechazadas.',
+    )
+
+    importe_solicitado = fields.Monetary(
+        string='Importe solicitado', currency_field='company_currency_id', readonly=True
+    )
+    importe_concedido = fields.Monetary(
+        string='Importe concedido', currency_field='company_currency_id', readonly=True
+    )
+    award_rate = fields.Float(
+        string='Tasa de concesión (%)', aggregator='avg', readonly=True,
+        help='Concedidas sobre resueltas (concedidas + rechazadas). Vacía si no '
+             'hay expedientes resueltos.',
+    )
+
+    def init(self):
+        table = SQL.identifier(self._table)
+        self.env.cr.execute(SQL("DROP MATERIALIZED VIEW IF EXISTS %s", table))
+        self.env.cr.execute(SQL("""
+            CREATE MATERIALIZED VIEW %s AS (
+                SELECT
+                    min(p.id) AS id,
+                    p.grant_call_id,
+                    p.stage_id,
+                    p.company_id,
+                    c.currency_id AS company_currency_id,
+                    count(*) AS project_count,
+                    count(*) FILTER (WHERE p.state = 'draft') AS draft_count,
+                    count(*) FILTER (WHERE p.state = 'submitted') AS submitted_count,
+                    count(*) FILTER (WHERE p.state = 'awarded') AS awarded_count,
+                    count(*) FILTER (WHERE p.state = 'rejected') AS rejected_count,
+                    count(*) FILTER (WHERE p.state = 'cancel') AS cancel_count,
+                    count(*) FILTER (WHERE p.state IN ('awarded', 'rejected')) AS resolved_count,
+                    sum(COALESCE(p.importe_solicitado, 0)) AS importe_solicitado,
+                    sum(COALESCE(p.importe_concedido, 0)) AS importe_concedido,
+                    100.0 * count(*) FILTER (WHERE p.state = 'awarded')
+                        / NULLIF(count(*) FILTER (WHERE p.state IN ('awarded', 'rejected')), 0)
+                        AS award_rate
+                FROM orbalia_project p
+                JOIN res_company c ON c.id = p.company_id
+                GROUP BY p.grant_call_id, p.stage_id, p.company_id, c.currency_id
+            )
+        """, table))
+        # Necesario para refrescar sin bloquear las lecturas (CONCURRENTLY)
+        self.env.cr.execute(SQL(
+            "CREATE UNIQUE INDEX %s ON %s (id)",
+            SQL.identifier(f'{self._table}_id_uniq'), table,
+        ))
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        """La tasa de concesión de cada grupo se calcula con las sumas de
+        concedidas y resueltas del grupo, no como media de las tasas de sus
+        filas; queda vacía si el grupo no tiene expedientes resueltos."""
+        fnames = {spec.split(':')[0] for spec in fields}
+        if 'award_rate' not in fnames:
+            return super().read_group(domain, fields, groupby, offset, limit, orderby, lazy)
+        extra = [fname for fname in ('awarded_count', 'resolved_count') if fname not in fnames]
+        groups = super().read_group(
+            domain, list(fields) + [f'{fname}:sum' for fname in extra],
+            groupby, offset, limit, orderby, lazy,
+        )
+        for group in groups:
+            awarded = group.get('awarded_count') or 0
+            resolved = group.get('resolved_count') or 0
+            group['award_rate'] = 100.0 * awarded / resolved if resolved else False
+            for fname in extra:
+                group.pop(fname, None)
+        return groups
+
+    @api.model
+    def _refresh(self):
+        """Recalcula la vista materializada (acción planificada)."""
+        self.env['orbalia.project'].flush_model()
+        self.env.cr.execute(SQL(
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY %s", SQL.identifier(self._table),
+        ))
+        self.env.invalidate_all()
+
+    @api.model
+    def _schedule_refresh(self):
+        """Programa un refresco de la acción planificada, una vez por transacción."""
+        data = self.env.cr.precommit.data
+        if data.get('orbalia_base.report_refresh'):
+            return
+        data['orbalia_base.report_refresh'] = True
+        cron = self.env.ref('orbalia_base.ir_cron_refresh_project_report', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
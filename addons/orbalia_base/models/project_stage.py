@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
 
 
@@ -42,6 +42,20 @@ class OrbaliaProjectStage(models.Model):
         last = self.search([('grant_call_id', '=', grant_call_id)], order='sequence desc', limit=1)
         return (last.sequence or 0) + 10
 
+    @api.model
+    @tools.ormcache('grant_call_ids')
+    def _stage_ids_for_calls(self, grant_call_ids):
+        """Ids de las etapas activas de las convocatorias, en orden estable.
+
+        Se cachea por registro (``grant_call_ids`` es una tupla ordenada) y se
+        invalida al crear, modificar o borrar etapas.
+        """
+        dom = [('active', '=', True), ('grant_call_id', 'in', list(grant_call_ids))]
+        return tuple(self.sudo().search(dom, order='grant_call_id, sequence, id').ids)
+
+    def _invalidate_stage_ids_cache(self):
+        self.env.registry.clear_cache()
+
     def _context_grant_call_id(self):
         """Obtiene el ID de convocatoria desde vals o contexto."""
         return (
@@ -65,7 +79,9 @@ class OrbaliaProjectStage(models.Model):
         if not vals.get('sequence') or vals.get('sequence') in (0, 1, 2, 3, 4, 5, 6, 7, 8, 9):
             vals['sequence'] = self._next_sequence_for_call(gc_id)
 
-        return super().create(vals)
+        record = super().create(vals)
+        self._invalidate_stage_ids_cache()
+        return record
 
     def write(self, vals):
         """Normaliza secuencia cuando se reordena desde el Kanban."""
@@ -74,7 +90,16 @@ class OrbaliaProjectStage(models.Model):
             seq = vals.get('sequence')
             if seq and seq < 10:
                 vals['sequence'] = self._next_sequence_for_call(gc_id)
-        return super().write(vals)
+        res = super().write(vals)
+        # Solo estos campos afectan a las columnas del Kanban de expedientes
+        if {'active', 'sequence', 'grant_call_id'} & set(vals):
+            self._invalidate_stage_ids_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._invalidate_stage_ids_cache()
+        return res
 
     @api.model
     def name_create(self, name):
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+
+
+class OrbaliaProjectStageMove(models.TransientModel):
+    _name = 'orbalia.project.stage.move'
+    _description = 'Cambio masivo de etapa de expedientes'
+
+    project_ids = fields.Many2many('orbalia.project', string='Expedientes', required=True)
+    grant_call_id = fields.Many2one(
+        'orbalia.grant.call', string='Convocatoria', compute='_compute_grant_call_id'
+    )
+    stage_id = fields.Many2one(
+        'orbalia.project.stage',
+        string='Nueva etapa',
+        required=True,
+        domain="[('grant_call_id', '=', grant_call_id)]",
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if self.env.context.get('active_model') == 'orbalia.project':
+            res['project_ids'] = [(6, 0, self.env.context.get('active_ids') or [])]
+        return res
+
+    @api.depends('project_ids')
+    def _compute_grant_call_id(self):
+        for wizard in self:
+            calls = wizard.project_ids.grant_call_id
+            wizard.grant_call_id = calls if len(calls) == 1 else False
+
+    def action_move(self):
+        self.ensure_one()
+        if not self.grant_call_id:
+            raise ValidationError(_("Los expedientes deben pertenecer a una única convocatoria."))
+        result = self.project_ids.move_to_stage(self.stage_id.id)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': _("%d expedientes movidos a '%s'.") % (result['moved'], self.stage_id.name),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
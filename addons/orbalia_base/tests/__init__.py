@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+from . import test_code_allocation
+from . import test_write
+from . import test_stage_move
+from . import test_project_report
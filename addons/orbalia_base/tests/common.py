@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase
+
+
+class OrbaliaCase(TransactionCase):
+    """Convocatoria con dos etapas y una cuenta con contacto para crear
+    expedientes de prueba."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Project = cls.env['orbalia.project']
+        cls.grant_call = cls.env['orbalia.grant.call'].create({'name': 'Convocatoria de prueba'})
+        Stage = cls.env['orbalia.project.stage']
+        cls.stage_draft = Stage.create({
+            'name': 'Borrador', 'grant_call_id': cls.grant_call.id, 'sequence': 10,
+        })
+        cls.stage_done = Stage.create({
+            'name': 'Resuelta', 'grant_call_id': cls.grant_call.id, 'sequence': 20,
+        })
+        cls.partner = cls.env['res.partner'].create({'name': 'Cuenta de prueba', 'is_company': True})
+        cls.contact = cls.env['res.partner'].create({
+            'name': 'Contacto de prueba', 'parent_id': cls.partner.id,
+        })
+
+    @classmethod
+    def _project_vals(cls, **vals):
+        return dict({
+            'title': 'Expediente de prueba',
+            'importe_solicitado': 1000.0,
+            'grant_call_id': cls.grant_call.id,
+            'stage_id': cls.stage_draft.id,
+            'partner_id': cls.partner.id,
+            'contacto_primario_id': cls.contact.id,
+        }, **vals)
+
+    @classmethod
+    def _create_projects(cls, count, **vals):
+        return cls.Project.create([cls._project_vals(**vals) for _i in range(count)])
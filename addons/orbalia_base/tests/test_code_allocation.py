@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from itertools import product
+from unittest.mock import patch
+
+from ..models import project
+from .common import OrbaliaCase
+
+
+class TestCodeAllocation(OrbaliaCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sequence = cls.env.ref('orbalia_base.seq_orbalia_grant')
+
+    def setUp(self):
+        super().setUp()
+        # Los bloques se reservan con un cursor propio: que use el del test
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+        project._code_blocks.clear()
+        self.addCleanup(project._code_blocks.clear)
+
+    def _next_by_code(self):
+        return self.env['ir.sequence'].next_by_code('orbalia.grant')
+
+    def _number(self, code):
+        return int(code.rsplit('/', 1)[1])
+
+    def _set_block_mode(self, block_size):
+        params = self.env['ir.config_parameter']
+        params.set_param(project.CODE_ALLOCATION_PARAM, 'block')
+        params.set_param(project.CODE_BLOCK_SIZE_PARAM, block_size)
+
+    def test_reserve_codes_follow_next_by_code(self):
+        for implementation, step in product(('standard', 'no_gap'), (1, 3)):
+            with self.subTest(implementation=implementation, step=step):
+                self.sequence.write({'implementation': implementation, 'number_increment': step})
+                first = self._next_by_code()
+                codes = self.Project._reserve_codes(3)
+                last = self._next_by_code()
+                start = self._number(first)
+                self.assertEqual(
+                    [first, *codes, last],
+                    [self.sequence.get_next_char(start + step * i) for i in range(5)],
+                )
+
+    def test_create_uses_reserved_codes(self):
+        first = self._next_by_code()
+        projects = self._create_projects(2) + self.Project.create(self._project_vals(name='MANUAL/1'))
+        start = self._number(first)
+        self.assertEqual(projects.mapped('name'), [
+            self.sequence.get_next_char(start + 1),
+            self.sequence.get_next_char(start + 2),
+            'MANUAL/1',
+        ])
+
+    def test_block_reused_across_calls(self):
+        for implementation in ('standard', 'no_gap'):
+            with self.subTest(implementation=implementation):
+                project._code_blocks.clear()
+                self.sequence.write({'implementation': implementation, 'number_increment': 2})
+                self._set_block_mode(5)
+                # El bloque se reserva en otro cursor, que lee de la base de datos
+                self.env.flush_all()
+                first = self.Project._reserve_codes(2)
+                second = self.Project._reserve_codes(2)
+                after = self._next_by_code()
+                start = self._number(first[0])
+                self.assertEqual(
+                    first + second,
+                    [self.sequence.get_next_char(start + 2 * i) for i in range(4)],
+                )
+                # Un único bloque reservado: la secuencia avanzó 5 posiciones
+                self.assertEqual(self._number(after), start + 2 * 5)
+
+    def test_block_larger_than_block_size(self):
+        self._set_block_mode(2)
+        codes = self.Project._reserve_codes(3)
+        start = self._number(codes[0])
+        self.assertEqual(codes, [self.sequence.get_next_char(start + i) for i in range(3)])
+        self.assertEqual(self._number(self._next_by_code()), start + 3)
+
+    def test_block_dropped_on_prefix_change(self):
+        self._set_block_mode(5)
+        start = self._number(self.Project._reserve_codes(1)[0])
+        with patch.object(
+            type(self.sequence), '_get_prefix_suffix', autospec=True, return_value=('NEXT/', ''),
+        ):
+            code = self.Project._reserve_codes(1)[0]
+        # Los 4 códigos restantes del año anterior se descartan
+        self.assertEqual(code, 'NEXT/%04d' % (start + 5))
+        self.assertEqual([key[2] for key in project._code_blocks], ['NEXT/'])
+
+    def test_code_gap_view(self):
+        self.Project.create([
+            self._project_vals(name='GAPTEST/%04d' % number) for number in (1, 2, 5, 9)
+        ])
+        self.env.flush_all()
+        gaps = self.env['orbalia.project.code.gap'].search([('prefix', '=', 'GAPTEST/')])
+        self.assertRecordValues(gaps, [
+            {'gap_start': 3, 'gap_end': 4, 'missing_count': 2,
+             'previous_code': 'GAPTEST/0002', 'next_code': 'GAPTEST/0005'},
+            {'gap_start': 6, 'gap_end': 8, 'missing_count': 3,
+             'previous_code': 'GAPTEST/0005', 'next_code': 'GAPTEST/0009'},
+        ])
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from .common import OrbaliaCase
+
+
+class TestProjectReport(OrbaliaCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Report = cls.env['orbalia.project.report']
+        cls._create_projects(3)
+        cls._create_projects(1, state='awarded')
+        cls._create_projects(5, state='awarded', stage_id=cls.stage_done.id)
+        cls._create_projects(5, state='rejected', stage_id=cls.stage_done.id)
+
+        # Convocatoria sin expedientes resueltos
+        cls.other_call = cls.env['orbalia.grant.call'].create({'name': 'Otra convocatoria'})
+        other_stage = cls.env['orbalia.project.stage'].create({
+            'name': 'Borrador', 'grant_call_id': cls.other_call.id, 'sequence': 10,
+        })
+        cls._create_projects(2, grant_call_id=cls.other_call.id, stage_id=other_stage.id)
+
+    def setUp(self):
+        super().setUp()
+        self.Report._refresh()
+
+    def _award_rates(self, domain, groupby):
+        groups = self.Report.read_group(domain, ['award_rate', 'project_count'], [groupby])
+        for group in groups:
+            self.assertNotIn('awarded_count', group)
+            self.assertNotIn('resolved_count', group)
+        return {group[groupby][0]: group['award_rate'] for group in groups}
+
+    def test_award_rate_by_stage(self):
+        rates = self._award_rates([('grant_call_id', '=', self.grant_call.id)], 'stage_id')
+        self.assertEqual(rates, {self.stage_draft.id: 100.0, self.stage_done.id: 50.0})
+
+    def test_award_rate_by_grant_call(self):
+        rates = self._award_rates(
+            [('grant_call_id', 'in', (self.grant_call + self.other_call).ids)], 'grant_call_id',
+        )
+        # 6 concedidas de 11 resueltas, no la media de las filas (75 %)
+        self.assertAlmostEqual(rates[self.grant_call.id], 600.0 / 11)
+        self.assertIs(rates[self.other_call.id], False)
+
+    def test_read_group_without_award_rate(self):
+        groups = self.Report.read_group(
+            [('grant_call_id', '=', self.grant_call.id)], ['project_count'], ['grant_call_id'],
+        )
+        self.assertEqual(groups[0]['project_count'], 14)
+        self.assertNotIn('award_rate', groups[0])
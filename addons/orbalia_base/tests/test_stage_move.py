@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from odoo.exceptions import ValidationError
+
+from .common import OrbaliaCase
+
+OLD = datetime(2020, 1, 1)
+
+
+class TestStageMove(OrbaliaCase):
+
+    def setUp(self):
+        super().setUp()
+        self.drafts = self._create_projects(2)
+        self.done = self._create_projects(1, stage_id=self.stage_done.id)
+        self.projects = self.drafts + self.done
+        self.projects.write({'last_stage_date': OLD})
+
+    def _new_messages(self, before):
+        return self.env['mail.message'].search([
+            ('model', '=', 'orbalia.project'),
+            ('res_id', 'in', self.projects.ids),
+            ('id', 'not in', before.ids),
+        ])
+
+    def test_move_to_stage(self):
+        before = self._new_messages(self.env['mail.message'])
+        result = self.projects.move_to_stage(self.stage_done.id)
+        self.assertEqual(result, {
+            'moved': 2,
+            'columns': [
+                {'stage_id': self.stage_draft.id, 'name': 'Borrador', 'count': 0},
+                {'stage_id': self.stage_done.id, 'name': 'Resuelta', 'count': 3},
+            ],
+        })
+        self.assertEqual(self.projects.stage_id, self.stage_done)
+
+        for project in self.drafts:
+            self.assertNotEqual(project.last_stage_date, OLD)
+            self.assertEqual(project.last_stage_user_id, self.env.user)
+        self.assertEqual(self.done.last_stage_date, OLD)
+
+        # Una nota por expediente movido, sin valores de seguimiento
+        notes = self._new_messages(before)
+        self.assertEqual(sorted(notes.mapped('res_id')), sorted(self.drafts.ids))
+        for note in notes:
+            self.assertIn('Borrador', note.body)
+            self.assertIn('Resuelta', note.body)
+        self.assertFalse(notes.tracking_value_ids)
+
+    def test_move_to_stage_nothing_moved(self):
+        before = self._new_messages(self.env['mail.message'])
+        result = self.done.move_to_stage(self.stage_done.id)
+        self.assertEqual(result['moved'], 0)
+        self.assertFalse(self._new_messages(before))
+
+    def test_move_to_stage_other_call(self):
+        other_call = self.env['orbalia.grant.call'].create({'name': 'Otra convocatoria'})
+        other_stage = self.env['orbalia.project.stage'].create({
+            'name': 'Borrador', 'grant_call_id': other_call.id, 'sequence': 10,
+        })
+        with self.assertRaises(ValidationError):
+            self.projects.move_to_stage(other_stage.id)
+        self.assertEqual(self.drafts.stage_id, self.stage_draft)
+
+    def test_wizard(self):
+        wizard = self.env['orbalia.project.stage.move'].with_context(
+            active_model='orbalia.project', active_ids=self.projects.ids,
+        ).create({'stage_id': self.stage_done.id})
+        self.assertEqual(wizard.project_ids, self.projects)
+        self.assertEqual(wizard.grant_call_id, self.grant_call)
+        wizard.action_move()
+        self.assertEqual(self.projects.stage_id, self.stage_done)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from odoo import fields
+
+from .common import OrbaliaCase
+
+OLD = datetime(2020, 1, 1)
+
+
+class TestWrite(OrbaliaCase):
+
+    def setUp(self):
+        super().setUp()
+        self.projects = self._create_projects(1, title='Primero') + self._create_projects(1, title='Segundo')
+        # Trazabilidad antigua para distinguir los registros que se vuelven a marcar
+        self.projects.write({'last_change_date': OLD, 'last_stage_date': OLD})
+
+    def assertStamped(self, records, fname):
+        for record in records:
+            self.assertNotEqual(record[fname], OLD, record.title)
+            self.assertEqual(record[fname.replace('_date', '_user_id')], self.env.user, record.title)
+
+    def assertNotStamped(self, records, fname):
+        for record in records:
+            self.assertEqual(record[fname], OLD, record.title)
+
+    def test_noop_write(self):
+        project = self.projects[0]
+        vals = {
+            'title': 'Primero',
+            'importe_solicitado': 1000,
+            'partner_id': self.partner.id,
+            'stage_id': self.stage_draft.id,
+            'organismo': '',
+            'fecha_solicitud': fields.Date.to_string(project.fecha_solicitud),
+        }
+        project.fetch(list(vals))
+        with self.assertQueryCount(0):
+            self.assertTrue(project.write(vals))
+        self.assertNotStamped(project, 'last_change_date')
+        self.assertNotStamped(project, 'last_stage_date')
+
+    def test_partial_change(self):
+        first, second = self.projects
+        self.projects.write({'title': 'Primero'})
+        self.assertEqual(self.projects.mapped('title'), ['Primero', 'Primero'])
+        self.assertNotStamped(first, 'last_change_date')
+        self.assertStamped(second, 'last_change_date')
+
+    def test_stage_split(self):
+        first, second = self.projects
+        second.write({'stage_id': self.stage_done.id, 'last_change_date': OLD, 'last_stage_date': OLD})
+
+        self.projects.write({'stage_id': self.stage_done.id, 'title': 'Nuevo'})
+        self.assertEqual(self.projects.stage_id, self.stage_done)
+        self.assertStamped(self.projects, 'last_change_date')
+        self.assertStamped(first, 'last_stage_date')
+        self.assertNotStamped(second, 'last_stage_date')
+
+    def test_stage_only_moved(self):
+        first, second = self.projects
+        second.write({'stage_id': self.stage_done.id, 'last_change_date': OLD, 'last_stage_date': OLD})
+
+        self.projects.write({'stage_id': self.stage_done.id})
+        self.assertStamped(first, 'last_change_date')
+        self.assertStamped(first, 'last_stage_date')
+        self.assertNotStamped(second, 'last_change_date')
+        self.assertNotStamped(second, 'last_stage_date')
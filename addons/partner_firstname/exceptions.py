@@ -5,8 +5,14 @@ from odoo import exceptions
 
 class EmptyNamesError(exceptions.ValidationError):
     def __init__(self, record, env, value=None):
+        """``record`` may hold several partners, all of them are reported."""
         value = value or env._("No name is set.")
         self.record = record
         self._value = value
-        self._name = env._("Error(s) with partner %d's name.") % record.id
+        if len(record) == 1:
+            self._name = env._("Error(s) with partner %d's name.") % record.id
+        else:
+            self._name = env._("Error(s) with the names of partners %s.") % ", ".join(
+                str(record_id) for record_id in record.ids
+            )
         self.args = (self._name, value)
@@ -4,9 +4,19 @@
 import logging
 
 from odoo import fields, models
+from odoo.tools import SQL, split_every
+
+from .res_partner import ResPartner
 
 _logger = logging.getLogger(__name__)
 
+# Separator and parts of ``ResPartner._get_computed_name`` for each order
+NAMES_ORDER_SQL = {
+    "first_last": (" ", ("firstname", "lastname")),
+    "last_first": (" ", ("lastname", "firstname")),
+    "last_first_comma": (", ", ("lastname", "firstname")),
+}
+
 
 class ResConfigSettings(models.TransientModel):
     _inherit = "res.config.settings"
@@ -22,6 +32,13 @@ class ResConfigSettings(models.TransientModel):
     partner_names_order_changed = fields.Boolean(
         config_parameter="partner_names_order_changed"
     )
+    partner_names_trigram_index = fields.Boolean(
+        string="Index names for substring search",
+        help="Create pg_trgm indexes on partner first name, last name and name, "
+        "so that searching part of a name uses an index. Requires the pg_trgm "
+        "PostgreSQL extension.",
+        config_parameter="partner_firstname.trigram_index",
+    )
 
     def _partner_names_order_selection(self):
         return [
@@ -46,6 +63,21 @@ class ResConfigSettings(models.TransientModel):
                 record.partner_names_order != current
             )
 
+    def set_values(self):
+        trigram_index = bool(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("partner_firstname.trigram_index")
+        )
+        super().set_values()
+        if self.partner_names_trigram_index != trigram_index and not self.env[
+            "res.partner"
+        ]._set_names_trigram_index(self.partner_names_trigram_index):
+            # pg_trgm is unavailable: keep searching with the B-tree indexes
+            self.env["ir.config_parameter"].sudo().set_param(
+                "partner_firstname.trigram_index", False
+            )
+
     def _partners_for_recalculating(self):
         return self.env["res.partner"].search(
             [
@@ -55,16 +87,72 @@ class ResConfigSettings(models.TransientModel):
             ]
         )
 
+    def _can_recalculate_partners_name_in_sql(self, order):
+        """Whether names can be rewritten with SQL for ``order``.
+
+        Only when ``_get_computed_name`` and ``_get_names_order`` are not
+        overridden, as submodules may compose the name from other fields or
+        use a different order per partner (language, country, company...).
+        """
+        partner_cls = type(self.env["res.partner"])
+        return (
+            order in NAMES_ORDER_SQL
+            and partner_cls._get_computed_name is ResPartner._get_computed_name
+            and partner_cls._get_names_order is ResPartner._get_names_order
+        )
+
+    def _recalculate_partners_name_sql(self, partners, order, chunk_size=10000):
+        """Rewrite the name of ``partners`` with chunked UPDATE statements.
+
+        Only rows whose name actually changes are updated; fields depending
+        on the name are then marked for recomputation as if it had been
+        recomputed by the ORM (which doesn't track it either).
+        """
+        separator, parts = NAMES_ORDER_SQL[order]
+        partner_model = self.env["res.partner"]
+        partner_model.flush_model(["firstname", "lastname", "name"])
+        name_sql = SQL(
+            "concat_ws(%s, %s)",
+            separator,
+            SQL(", ").join(SQL("NULLIF(%s, '')", SQL.identifier(f)) for f in parts),
+        )
+        updated = []
+        done = 0
+        for ids in split_every(chunk_size, partners.ids):
+            self.env.cr.execute(
+                SQL(
+                    """UPDATE res_partner SET name = %(name)s
+                    WHERE id IN %(ids)s AND name IS DISTINCT FROM %(name)s
+                    RETURNING id""",
+                    name=name_sql,
+                    ids=tuple(ids),
+                )
+            )
+            updated += [row[0] for row in self.env.cr.fetchall()]
+            done += len(ids)
+            _logger.info(
+                "Recalculated names for %d/%d partners.", done, len(partners)
+            )
+        updated_partners = partner_model.browse(updated)
+        updated_partners.invalidate_recordset(["name"])
+        updated_partners.modified(["name"])
+        return updated_partners
+
     def action_recalculate_partners_name(self):
         self.env["ir.config_parameter"].sudo().set_param(
             "partner_names_order", self.partner_names_order
         )
         partners = self._partners_for_recalculating()
         _logger.info("Recalculating names for %d partners.", len(partners))
-        # Use add_to_compute instead of _compute_name to avoid triggering
-        # _inverse_name_after_cleaning_whitespace, which can
-        # modify a partner's firstname, lastname and lastname2
-        self.env.add_to_compute(self.env["res.partner"]._fields["name"], partners)
+        order = self.env["res.partner"]._get_names_order()
+        if self._can_recalculate_partners_name_in_sql(order):
+            updated = self._recalculate_partners_name_sql(partners, order)
+            _logger.info("%d partner names changed.", len(updated))
+        else:
+            # Use add_to_compute instead of _compute_name to avoid triggering
+            # _inverse_name_after_cleaning_whitespace, which can
+            # modify a partner's firstname, lastname and lastname2
+            self.env.add_to_compute(self.env["res.partner"]._fields["name"], partners)
         self.partner_names_order_changed = False
         self.execute()
         _logger.info("%d partners updated.", len(partners))
@@ -4,13 +4,26 @@
 # Copyright 2024 Simone Rubino - Aion Tech
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 import logging
+import threading
+import time
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
+from odoo.osv import expression
+from odoo.tools import SQL, escape_psql
+from odoo.tools.sql import create_index, drop_index, index_exists
 
-from .. import exceptions
+from .. import exceptions, names
 
 _logger = logging.getLogger(__name__)
 
+# Above this number of partners, `_check_name` is done with a single query
+CHECK_NAME_SQL_THRESHOLD = 1000
+# Columns getting a pg_trgm index when enabled in the settings
+TRIGRAM_INDEX_FIELDS = ("firstname", "lastname", "name")
+TRIGRAM_INDEX_PARAM = "partner_firstname.trigram_index"
+# Hard limit of the results of the `name_search` fast path
+NAME_SEARCH_MAX_LIMIT = 100
+
 
 class ResPartner(models.Model):
     """Adds last name and first name; name becomes a stored function field."""
@@ -30,15 +43,7 @@ class ResPartner(models.Model):
     form_has_lastname_first = fields.Boolean(compute="_compute_form_has_lastname_first")
 
     def _compute_form_has_lastname_first(self):
-        default_order = (
-            self.env["res.config.settings"].sudo()._partner_names_order_default()
-        )
-        self.form_has_lastname_first = (
-            self.env["ir.config_parameter"]
-            .sudo()
-            .get_param("partner_names_order", default_order)
-            != "first_last"
-        )
+        self.form_has_lastname_first = self._get_names_order() != "first_last"
 
     @api.model
     def name_fields_in_vals(self, vals):
@@ -54,35 +59,127 @@ class ResPartner(models.Model):
         its inverse method.
 
         Note that, to avoid deleting the 'default_name' context for all partners when
-        it's not appropriate, we must call `create` for each partner individually with
-        the correct context.
+        it's not appropriate, partners are grouped by the context they must be created
+        with, and each group is created with a single call to `super`.
         """
-        created_partners = self.browse()
-        for vals in vals_list:
-            partner_context = dict(self.env.context)
+        has_default_name = "default_name" in self.env.context
+        copying = self.env.context.get("copy")
+        # Indexes in `vals_list`, by whether 'default_name' must be removed
+        groups = {False: [], True: []}
+        # (index, name, is_company) of the partners whose name must be split
+        to_split = []
+        for index, vals in enumerate(vals_list):
             is_company = vals.get("company_type") == "company"
+            pop_default_name = False
             if not is_company and self.name_fields_in_vals(vals) and "name" in vals:
                 del vals["name"]
-                partner_context.pop("default_name", None)
+                pop_default_name = True
             else:
-                name = vals.get("name", partner_context.get("default_name"))
+                name = vals.get("name", self.env.context.get("default_name"))
                 if name is not None:
-                    # Calculate the split fields
-                    inverted = self._get_inverse_name(
-                        self._get_whitespace_cleaned_name(name), is_company
-                    )
-                    for key, value in inverted.items():
-                        if not vals.get(key) or partner_context.get("copy"):
-                            vals[key] = value
-
+                    to_split.append((index, name, is_company))
                     # Remove the combined fields
                     vals.pop("name", None)
-                    partner_context.pop("default_name", None)
+                    pop_default_name = True
+            groups[pop_default_name and has_default_name].append(index)
+
+        if to_split:
+            # Calculate the split fields
+            indexes, full_names, is_companies = zip(*to_split)
+            inverted_names = self._get_inverse_names(
+                [self._get_whitespace_cleaned_name(name) for name in full_names],
+                is_companies,
+            )
+            for index, inverted in zip(indexes, inverted_names):
+                vals = vals_list[index]
+                for key, value in inverted.items():
+                    if not vals.get(key) or copying:
+                        vals[key] = value
+
+        created_ids = [None] * len(vals_list)
+        for pop_default_name, indexes in groups.items():
+            if not indexes:
+                continue
+            partner_context = dict(self.env.context)
+            if pop_default_name:
+                partner_context.pop("default_name")
             # pylint: disable=W8121
-            created_partners |= super(
-                ResPartner, self.with_context(partner_context)
-            ).create([vals])
-        return created_partners
+            partners = super(ResPartner, self.with_context(partner_context)).create(
+                [vals_list[index] for index in indexes]
+            )
+            for index, partner_id in zip(indexes, partners.ids):
+                created_ids[index] = partner_id
+        return self.browse(created_ids)
+
+    @api.model
+    def name_search(self, name="", domain=None, operator="ilike", limit=100):
+        """Search several words of a name in the first and last names.
+
+        When ``name`` holds at least two words, each word must be found in
+        the first name or the last name, in any order, and results are
+        ranked by how well the words match (whole name part, then prefix,
+        then anywhere). Falls back to the standard search when that finds
+        nothing, e.g. for company-prefixed names or emails.
+        """
+        tokens = self._name_search_tokens(name) if operator == "ilike" else []
+        if len(tokens) < 2:
+            return super().name_search(name, domain, operator, limit)
+        limit = min(limit or NAME_SEARCH_MAX_LIMIT, NAME_SEARCH_MAX_LIMIT)
+        token_domain = expression.AND(
+            [
+                ["|", ("firstname", "ilike", token), ("lastname", "ilike", token)]
+                for token in tokens
+            ]
+        )
+        self.flush_model()
+        query = self._search(expression.AND([token_domain, domain or []]))
+        firstname = SQL.identifier(query.table, "firstname")
+        lastname = SQL.identifier(query.table, "lastname")
+        rank = SQL(" + ").join(
+            SQL(
+                """CASE
+                    WHEN %(first)s ILIKE %(exact)s OR %(last)s ILIKE %(exact)s THEN 0
+                    WHEN %(first)s ILIKE %(prefix)s OR %(last)s ILIKE %(prefix)s THEN 1
+                    ELSE 2
+                END""",
+                first=firstname,
+                last=lastname,
+                exact=escape_psql(token),
+                prefix=f"{escape_psql(token)}%",
+            )
+            for token in tokens
+        )
+        self.env.cr.execute(
+            SQL(
+                """SELECT id FROM (%s) AS ranked
+                ORDER BY rank, complete_name, id DESC
+                LIMIT %s""",
+                query.select(
+                    SQL.identifier(query.table, "id"),
+                    SQL("%s AS rank", rank),
+                    SQL(
+                        "%s AS complete_name",
+                        SQL.identifier(query.table, "complete_name"),
+                    ),
+                ),
+                limit,
+            )
+        )
+        records = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if not records:
+            return super().name_search(name, domain, operator, limit)
+        return [(record.id, record.display_name) for record in records.sudo()]
+
+    @api.model
+    def _name_search_tokens(self, name):
+        """Words of ``name`` matched against the first and last names."""
+        return [
+            token
+            for token in self._get_whitespace_cleaned_name(name or "")
+            .replace(",", " ")
+            .split()
+            if token
+        ]
 
     def get_extra_default_copy_values(self, order):
         """Method to add '(copy)' suffix to lastname or firstname, depending on name
@@ -122,10 +219,10 @@ class ResPartner(models.Model):
             fields_list.append("name")
         result = super().default_get(fields_list)
 
-        inverted = self._get_inverse_name(
-            self._get_whitespace_cleaned_name(result.get("name", "")),
-            result.get("is_company", False),
-        )
+        inverted = self._get_inverse_names(
+            [self._get_whitespace_cleaned_name(result.get("name", ""))],
+            [result.get("is_company", False)],
+        )[0]
 
         for field in list(inverted.keys()):
             if field in fields_list:
@@ -142,6 +239,17 @@ class ResPartner(models.Model):
         """Get names order configuration from system parameters.
         You can override this method to read configuration from language,
         country, company or other"""
+        return self._get_names_order_param()
+
+    @api.model
+    @tools.ormcache()
+    def _get_names_order_param(self):
+        """Names order system parameter, cached per registry.
+
+        Setting any system parameter (as
+        ``ResConfigSettings.action_recalculate_partners_name`` does) clears
+        the registry caches, so a new order is picked up right away.
+        """
         return (
             self.env["ir.config_parameter"]
             .sudo()
@@ -153,13 +261,7 @@ class ResPartner(models.Model):
         """Compute the 'name' field according to splitted data.
         You can override this method to change the order of lastname and
         firstname the computed name"""
-        order = self._get_names_order()
-        if order == "last_first_comma":
-            return ", ".join(p for p in (lastname, firstname) if p)
-        elif order == "first_last":
-            return " ".join(p for p in (firstname, lastname) if p)
-        else:
-            return " ".join(p for p in (lastname, firstname) if p)
+        return names.join_name(lastname, firstname, self._get_names_order())
 
     @api.depends("firstname", "lastname")
     def _compute_name(self):
@@ -176,8 +278,9 @@ class ResPartner(models.Model):
         for record in self:
             # Remove unneeded whitespace
             clean = record._get_whitespace_cleaned_name(record.name)
-            record.name = clean
-            record._inverse_name()
+            if clean != record.name:
+                record.name = clean
+        self._inverse_name()
 
     @api.model
     def _get_whitespace_cleaned_name(self, name, comma=False):
@@ -185,29 +288,10 @@ class ResPartner(models.Model):
 
         Removes leading, trailing and duplicated whitespace.
         """
-        if isinstance(name, bytes):
-            # With users coming from LDAP, name can be a byte encoded string.
-            # This happens with FreeIPA for instance.
-            name = name.decode("utf-8")
-
-        try:
-            name = " ".join(name.split()) if name else name
-        except UnicodeDecodeError:
-            # with users coming from LDAP, name can be a str encoded as utf-8
-            # this happens with ActiveDirectory for instance, and in that case
-            # we get a UnicodeDecodeError during the automatic ASCII -> Unicode
-            # conversion that Python does for us.
-            # In that case we need to manually decode the string to get a
-            # proper unicode string.
-            name = " ".join(name.decode("utf-8").split()) if name else name
-
-        if comma:
-            name = name.replace(" ,", ",")
-            name = name.replace(", ", ",")
-        return name
+        return names.clean_whitespace(name, comma=comma)
 
     @api.model
-    def _get_inverse_name(self, name, is_company=False):
+    def _get_inverse_name(self, name, is_company=False, order=None):
         """Compute the inverted name.
 
         - If the partner is a company, save it in the lastname.
@@ -219,61 +303,161 @@ class ResPartner(models.Model):
 
         When this method is called, :attr:`~.name` already has unified and
         trimmed whitespace.
+
+        Pass ``order`` to avoid resolving the names order for each name when
+        splitting many of them.
         """
-        # Company name goes to the lastname
-        if is_company or not name:
-            parts = [name or False, False]
-        # Guess name splitting
-        else:
-            order = self._get_names_order()
-            # Remove redundant spaces
-            name = self._get_whitespace_cleaned_name(
-                name, comma=(order == "last_first_comma")
-            )
-            parts = name.split("," if order == "last_first_comma" else " ", 1)
-            if len(parts) > 1:
-                if order == "first_last":
-                    parts = [" ".join(parts[1:]), parts[0]]
-                else:
-                    parts = [parts[0], " ".join(parts[1:])]
-            else:
-                while len(parts) < 2:
-                    parts.append(False)
-        return {"lastname": parts[0], "firstname": parts[1]}
+        return names.split_name(name, is_company, order or self._get_names_order())
+
+    @api.model
+    def _get_inverse_names(self, full_names, is_companies=None, order=None):
+        """Compute the inverted names of a list of names at once.
+
+        Uses the ORM-free splitter unless :meth:`_get_inverse_name` is
+        overridden, in which case the override is called for each name.
+        """
+        order = order or self._get_names_order()
+        if type(self)._get_inverse_name is ResPartner._get_inverse_name:
+            return names.split_names(full_names, is_companies, order)
+        if is_companies is None:
+            is_companies = [False] * len(full_names)
+        # Overrides follow the documented ``(name, is_company)`` signature
+        return [
+            self._get_inverse_name(name, is_company)
+            for name, is_company in zip(full_names, is_companies)
+        ]
 
     def _inverse_name(self):
-        """Try to revert the effect of :meth:`._compute_name`."""
-        for record in self:
-            parts = record._get_inverse_name(record.name, record.is_company)
-            record.lastname = parts["lastname"]
-            record.firstname = parts["firstname"]
+        """Try to revert the effect of :meth:`._compute_name`.
+
+        Only the name parts that actually change are written, so setting a
+        name that splits back into the current parts does not write nor
+        trigger any recomputation.
+        """
+        inverted = self._get_inverse_names(
+            self.mapped("name"), self.mapped("is_company")
+        )
+        for record, parts in zip(self, inverted):
+            vals = {
+                field: parts[field]
+                for field in ("lastname", "firstname")
+                if (record[field] or False) != (parts[field] or False)
+            }
+            if vals:
+                record.write(vals)
 
     @api.constrains("firstname", "lastname")
     def _check_name(self):
-        """Ensure at least one name is set."""
-        for record in self:
-            if all(
-                (
-                    record.type == "contact" or record.is_company,
-                    not (record.firstname or record.lastname),
+        """Ensure at least one name is set.
+
+        All offending partners are reported in a single error. Large
+        recordsets are checked with one query instead of reading each record.
+        """
+        if len(self) > CHECK_NAME_SQL_THRESHOLD:
+            self.flush_recordset(["type", "is_company", "firstname", "lastname"])
+            self.env.cr.execute(
+                SQL(
+                    """SELECT id FROM res_partner
+                    WHERE id IN %s
+                        AND (type = 'contact' OR is_company)
+                        AND COALESCE(firstname, '') = ''
+                        AND COALESCE(lastname, '') = ''
+                    ORDER BY id""",
+                    tuple(self.ids),
                 )
-            ):
-                raise exceptions.EmptyNamesError(record, self.env)
+            )
+            offenders = self.browse([row[0] for row in self.env.cr.fetchall()])
+        else:
+            offenders = self.filtered(
+                lambda record: (record.type == "contact" or record.is_company)
+                and not (record.firstname or record.lastname)
+            )
+        if offenders:
+            raise exceptions.EmptyNamesError(offenders, self.env)
 
     @api.model
-    def _install_partner_firstname(self):
+    def _install_partner_firstname(self, chunk_size=1000, commit=False):
         """Save names correctly in the database.
 
         Before installing the module, field ``name`` contains all full names.
         When installing it, this method parses those names and saves them
         correctly into the database. This can be called later too if needed.
+
+        Partners are processed in chunks of ``chunk_size`` by ascending id,
+        flushing and emptying the cache after each chunk to bound memory. With
+        ``commit`` (as the "Split partner names" scheduled action does), each
+        chunk is committed: processed partners no longer match the search, so
+        an interrupted run resumes where it stopped.
         """
-        # Find records with empty firstname and lastname
-        records = self.search([("firstname", "=", False), ("lastname", "=", False)])
+        commit = commit and not getattr(threading.current_thread(), "testing", False)
+        domain = [("firstname", "=", False), ("lastname", "=", False)]
+        started = time.monotonic()
+        last_id = total = 0
+        while True:
+            # Find records with empty firstname and lastname
+            records = self.search(
+                domain + [("id", ">", last_id)], order="id", limit=chunk_size
+            )
+            if not records:
+                break
+            chunk_started = time.monotonic()
+            # Force calculations there
+            records._inverse_name()
+            self.env.flush_all()
+            if commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+            last_id = records[-1].id
+            total += len(records)
+            _logger.info(
+                "%d partners updated installing module (up to id %d, %.0f records/s).",
+                total,
+                last_id,
+                len(records) / max(time.monotonic() - chunk_started, 1e-6),
+            )
+        _logger.info(
+            "%d partners updated installing module in %.1fs.",
+            total,
+            time.monotonic() - started,
+        )
+
+    def init(self):
+        super().init()
+        if self.env["ir.config_parameter"].sudo().get_param(TRIGRAM_INDEX_PARAM):
+            self._set_names_trigram_index(True)
+
+    @api.model
+    def _set_names_trigram_index(self, enabled):
+        """Create or drop the trigram indexes on the name columns.
 
-        # Force calculations there
-        records._inverse_name()
-        _logger.info("%d partners updated installing module.", len(records))
+        These let substring (``ilike``) searches on names use an index. They
+        need the ``pg_trgm`` extension: when it is missing and can't be
+        created, nothing is done and ``False`` is returned.
+        """
+        cr = self.env.cr
+        if not enabled:
+            for fname in TRIGRAM_INDEX_FIELDS:
+                drop_index(cr, f"res_partner_{fname}_trgm_index", "res_partner")
+            return True
+        cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if not cr.rowcount:
+            try:
+                with cr.savepoint(flush=False):
+                    cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except Exception:
+                _logger.warning(
+                    "Extension pg_trgm is not available, partner names are "
+                    "searched without trigram indexes."
+                )
+                return False
+        for fname in TRIGRAM_INDEX_FIELDS:
+            index_name = f"res_partner_{fname}_trgm_index"
+            if not index_exists(cr, index_name):
+                _logger.info("Creating trigram index %s.", index_name)
+                create_index(
+                    cr, index_name, "res_partner", [f'"{fname}" gin_trgm_ops'], "gin"
+                )
+        return True
 
     # Disabling SQL constraint givint a more explicit error using a Python
     # contstraint
@@ -14,10 +14,10 @@ class ResUser(models.Model):
         result = super().default_get(fields_list)
 
         partner_model = self.env["res.partner"]
-        inverted = partner_model._get_inverse_name(
-            partner_model._get_whitespace_cleaned_name(result.get("name", "")),
-            result.get("is_company", False),
-        )
+        inverted = partner_model._get_inverse_names(
+            [partner_model._get_whitespace_cleaned_name(result.get("name", ""))],
+            [result.get("is_company", False)],
+        )[0]
 
         for field in list(inverted.keys()):
             if field in fields_list:
@@ -0,0 +1,75 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+"""Splitting and joining of partner names, free of any ORM access.
+
+These functions implement the default behavior of
+:meth:`~odoo.addons.partner_firstname.models.res_partner.ResPartner._get_inverse_name`,
+:meth:`~.ResPartner._get_computed_name` and
+:meth:`~.ResPartner._get_whitespace_cleaned_name`; the ``*_many`` variants
+process whole lists in a single call for bulk operations.
+"""
+
+
+def clean_whitespace(name, comma=False):
+    """Remove leading, trailing and duplicated whitespace from ``name``.
+
+    With ``comma``, also remove the whitespace around commas.
+    """
+    if isinstance(name, bytes):
+        # With users coming from LDAP, name can be a byte encoded string.
+        # This happens with FreeIPA for instance.
+        name = name.decode("utf-8")
+    if not name:
+        return name
+    name = " ".join(name.split())
+    if comma:
+        name = name.replace(" ,", ",").replace(", ", ",")
+    return name
+
+
+def clean_whitespace_many(names, comma=False):
+    return [clean_whitespace(name, comma) for name in names]
+
+
+def split_name(name, is_company=False, order="first_last"):
+    """Return ``{"lastname": ..., "firstname": ...}`` guessed from ``name``.
+
+    Company names go entirely to the last name; other names are split once
+    on the separator of ``order``.
+    """
+    if is_company or not name:
+        return {"lastname": name or False, "firstname": False}
+    comma = order == "last_first_comma"
+    parts = clean_whitespace(name, comma).split("," if comma else " ", 1)
+    if len(parts) == 1:
+        return {"lastname": parts[0], "firstname": False}
+    if order == "first_last":
+        return {"lastname": parts[1], "firstname": parts[0]}
+    return {"lastname": parts[0], "firstname": parts[1]}
+
+
+def split_names(names, is_companies=None, order="first_last"):
+    """Split every name of ``names``, see :func:`split_name`.
+
+    ``is_companies`` is an iterable of booleans parallel to ``names``;
+    when omitted, all names are split as persons.
+    """
+    if is_companies is None:
+        is_companies = [False] * len(names)
+    return [
+        split_name(name, is_company, order)
+        for name, is_company in zip(names, is_companies)
+    ]
+
+
+def join_name(lastname, firstname, order="first_last"):
+    """Return the full name composed from its parts according to ``order``."""
+    if order == "last_first_comma":
+        return ", ".join(p for p in (lastname, firstname) if p)
+    elif order == "first_last":
+        return " ".join(p for p in (firstname, lastname) if p)
+    return " ".join(p for p in (lastname, firstname) if p)
+
+
+def join_names(parts, order="first_last"):
+    """Compose every ``(lastname, firstname)`` of ``parts``."""
+    return [join_name(lastname, firstname, order) for lastname, firstname in parts]
@@ -3,8 +3,12 @@ from . import (
     test_defaults,
     test_delete,
     test_empty,
+    test_install,
     test_name,
+    test_name_search,
+    test_names,
     test_partner_form,
+    test_performance,
     test_user_form,
     test_order,
     test_copy,
@@ -1,7 +1,10 @@
 # Copyright 2015 Antiun Ingenieria S.L. - Antonio Espinosa
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
+from unittest.mock import patch
+
 from odoo.tests import TransactionCase
+from odoo.tools.sql import index_exists
 
 
 class TestConfigSettings(TransactionCase):
@@ -33,3 +36,51 @@ class TestConfigSettings(TransactionCase):
         self.assertTrue(self.config.partner_names_order_changed)
         self.config.action_recalculate_partners_name()
         self.assertFalse(self.config.partner_names_order_changed)
+
+    def test_recalculate_partners_name_sql(self):
+        partners = self.env["res.partner"].create(
+            [{"firstname": f"Petër{i}", "lastname": "Flanker"} for i in range(3)]
+        )
+        company = self.env["res.partner"].create(
+            {"name": "Flanker Inc", "is_company": True}
+        )
+        self.config.partner_names_order = "last_first_comma"
+        self.config.action_recalculate_partners_name()
+        self.assertEqual(
+            partners.mapped("name"),
+            ["Flanker, Petër0", "Flanker, Petër1", "Flanker, Petër2"],
+        )
+        self.assertEqual(partners[0].complete_name, "Flanker, Petër0")
+        self.assertEqual(company.name, "Flanker Inc")
+        self.config.partner_names_order = "first_last"
+        self.config.action_recalculate_partners_name()
+        self.assertEqual(partners[2].name, "Petër2 Flanker")
+
+    def test_recalculate_partners_name_sql_overridden_order(self):
+        self.assertTrue(self.config._can_recalculate_partners_name_in_sql("first_last"))
+        partner_cls = type(self.env["res.partner"])
+        with patch.object(
+            partner_cls, "_get_names_order", autospec=True, return_value="first_last"
+        ):
+            # The order may differ per partner: use the ORM
+            self.assertFalse(
+                self.config._can_recalculate_partners_name_in_sql("first_last")
+            )
+
+    def test_names_trigram_index(self):
+        index_names = [
+            f"res_partner_{fname}_trgm_index"
+            for fname in ("firstname", "lastname", "name")
+        ]
+        self.config.partner_names_trigram_index = True
+        self.config.execute()
+        enabled = self.env["ir.config_parameter"].get_param(
+            "partner_firstname.trigram_index"
+        )
+        for index_name in index_names:
+            # Without pg_trgm, the setting falls back to disabled
+            self.assertEqual(index_exists(self.env.cr, index_name), bool(enabled))
+        self.config.partner_names_trigram_index = False
+        self.config.execute()
+        for index_name in index_names:
+            self.assertFalse(index_exists(self.env.cr, index_name))
@@ -3,6 +3,8 @@
 
 """Test default values for models."""
 
+from unittest.mock import patch
+
 from odoo.tests import TransactionCase
 
 from .base import MailInstalled
@@ -77,3 +79,58 @@ class UserCase(PersonCase, MailInstalled):
         else:
             # Run tests
             super().tearDown()
+
+
+class BatchCase(TransactionCase):
+    """Test creating several ``res.partner`` in a single call."""
+
+    def test_mixed_batch_keeps_order(self):
+        """Partners needing different contexts are returned in input order."""
+        partners = (
+            self.env["res.partner"]
+            .with_context(default_name="BÄD")
+            .create(
+                [
+                    {"firstname": "Núñez", "lastname": "Fernán", "name": "BÄD1"},
+                    {"is_company": True, "company_type": "company"},
+                    # Explicitly without name: created keeping 'default_name'
+                    {"name": None, "type": "invoice"},
+                    {"name": "Petër Flanker"},
+                    {"lastname": "García Lorca"},
+                ]
+            )
+        )
+        self.assertRecordValues(
+            partners - partners[2],
+            [
+                {"firstname": "Núñez", "lastname": "Fernán"},
+                {"firstname": False, "lastname": "BÄD"},
+                {"firstname": "Petër", "lastname": "Flanker"},
+                {"firstname": False, "lastname": "García Lorca"},
+            ],
+        )
+        self.assertEqual(partners[2].type, "invoice")
+        # Its group was created in a separate, earlier batch
+        self.assertLess(partners[2].id, min((partners - partners[2]).ids))
+
+    def test_batch_single_create(self):
+        """Partners sharing the same context are created in one batch."""
+        partners = self.env["res.partner"].create(
+            [{"name": f"Batch Partner{i}"} for i in range(20)]
+        )
+        self.assertEqual(len(partners), 20)
+        self.assertEqual(partners.mapped("lastname")[-1], "Partner19")
+        self.assertEqual(partners.ids, sorted(partners.ids))
+
+    def test_batch_overridden_inverse_name(self):
+        """Overrides with the documented signature are used for batches."""
+
+        def _get_inverse_name(self, name, is_company=False):
+            return {"lastname": name.upper(), "firstname": False}
+
+        partner_model = self.env["res.partner"]
+        with patch.object(type(partner_model), "_get_inverse_name", _get_inverse_name):
+            partners = partner_model.create(
+                [{"name": "Petër Flanker"}, {"name": "Mönty"}]
+            )
+        self.assertEqual(partners.mapped("lastname"), ["PETËR FLANKER", "MÖNTY"])
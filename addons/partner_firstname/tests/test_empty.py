@@ -6,9 +6,12 @@
 To have more accurate results, remove the ``mail`` module before testing.
 """
 
+from unittest.mock import patch
+
 from odoo.tests import TransactionCase
 
 from .. import exceptions as ex
+from ..models import res_partner
 from .base import MailInstalled
 
 
@@ -72,3 +75,29 @@ class AddressCase(TransactionCase):
         self.original = self.env["res.partner"].create(
             {"is_company": False, "type": "delivery", "lastname": "", "firstname": ""}
         )
+
+
+class BatchCase(TransactionCase):
+    """Test emptying the names of several partners at once."""
+
+    def setUp(self):
+        super().setUp()
+        self.partners = self.env["res.partner"].create(
+            [{"firstname": f"Petër{i}", "lastname": "Flanker"} for i in range(3)]
+        )
+        self.partners[1].type = "invoice"
+
+    def _check_empty_names(self):
+        with self.assertRaises(ex.EmptyNamesError) as error:
+            self.partners.write({"firstname": False, "lastname": False})
+        self.assertEqual(error.exception.record, self.partners[0] | self.partners[2])
+        self.assertIn(
+            f"{self.partners[0].id}, {self.partners[2].id}", error.exception.args[0]
+        )
+
+    def test_all_offenders_reported(self):
+        self._check_empty_names()
+
+    def test_all_offenders_reported_sql(self):
+        with patch.object(res_partner, "CHECK_NAME_SQL_THRESHOLD", 1):
+            self._check_empty_names()
@@ -0,0 +1,46 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+"""Test splitting the names existing before installing the module."""
+
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase
+
+
+class InstallCase(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.partners = self.env["res.partner"].create(
+            [{"name": f"Petër{i} Flanker"} for i in range(5)]
+        )
+        # Emulate partners created before installing the module
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE res_partner SET firstname = NULL, lastname = NULL WHERE id IN %s",
+            (tuple(self.partners.ids),),
+        )
+        self.env.invalidate_all()
+
+    def test_install_in_chunks(self):
+        self.env["res.partner"]._install_partner_firstname(chunk_size=2)
+        self.assertRecordValues(
+            self.partners,
+            [{"firstname": f"Petër{i}", "lastname": "Flanker"} for i in range(5)],
+        )
+
+    def test_install_resumes(self):
+        """Partners already split are not processed again."""
+        self.partners[:3]._inverse_name()
+        self.env.flush_all()
+        partner_cls = type(self.env["res.partner"])
+        inverse_name = partner_cls._inverse_name
+        processed = []
+
+        def _inverse_name(records):
+            processed.extend(records.ids)
+            return inverse_name(records)
+
+        with patch.object(partner_cls, "_inverse_name", _inverse_name):
+            self.env["res.partner"]._install_partner_firstname(commit=True)
+        self.assertFalse(set(self.partners[:3].ids) & set(processed))
+        self.assertLessEqual(set(self.partners[3:].ids), set(processed))
+        self.assertEqual(self.partners[4].firstname, "Petër4")
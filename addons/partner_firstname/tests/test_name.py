@@ -31,6 +31,10 @@
 To have more accurate results, remove the ``mail`` module before testing.
 """
 
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase
+
 from .base import BaseCase
 
 
@@ -100,6 +104,48 @@ class PartnerCompanyCase(BaseCase):
         self.original.name = name
 
 
+class NoopWriteCase(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.partner = self.env["res.partner"].create({"name": "Petër Flanker"})
+        self.partner_cls = type(self.partner)
+
+    def _written_vals(self, name):
+        """Set ``name`` on the partner and return all the written values."""
+        with patch.object(
+            self.partner_cls,
+            "write",
+            autospec=True,
+            side_effect=self.partner_cls.write,
+        ) as write:
+            self.partner.name = name
+        return [call.args[1] for call in write.call_args_list]
+
+    def test_same_name(self):
+        """Setting the current name does not rewrite its parts."""
+        self.assertEqual(
+            self._written_vals("Petër Flanker"), [{"name": "Petër Flanker"}]
+        )
+
+    def test_same_name_with_whitespace(self):
+        """Only the whitespace cleaning is applied."""
+        self.assertEqual(
+            self._written_vals("  Petër   Flanker "),
+            [{"name": "  Petër   Flanker "}],
+        )
+        self.assertEqual(self.partner.name, "Petër Flanker")
+
+    def test_changed_part(self):
+        """Only the changed name part is written."""
+        self.assertEqual(
+            self._written_vals("Petër Bravo"),
+            [{"name": "Petër Bravo"}, {"lastname": "Bravo"}],
+        )
+        self.assertRecordValues(
+            self.partner, [{"firstname": "Petër", "lastname": "Bravo"}]
+        )
+
+
 class UserCase(PartnerContactCase):
     def create_original(self):
         name = f"{self.firstname} {self.lastname}"
@@ -0,0 +1,49 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+"""Test searching partners by several words of their name."""
+
+from odoo.tests import TransactionCase
+
+
+class NameSearchCase(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        partner_model = cls.env["res.partner"]
+        cls.prefix = partner_model.create(
+            {"firstname": "Juanjo", "lastname": "Garcíañez"}
+        )
+        cls.exact = partner_model.create({"firstname": "Juan", "lastname": "Garcíañ"})
+        cls.anywhere = partner_model.create(
+            {"firstname": "Don Juan", "lastname": "De Garcíañ"}
+        )
+        cls.other = partner_model.create({"firstname": "Juan", "lastname": "Flanker"})
+
+    def _search_ids(self, name, domain=None, limit=100):
+        return [
+            partner_id
+            for partner_id, _name in self.env["res.partner"].name_search(
+                name, domain, limit=limit
+            )
+        ]
+
+    def test_ranked_any_order(self):
+        expected = [self.exact.id, self.prefix.id, self.anywhere.id]
+        self.assertEqual(self._search_ids("juan garcíañ"), expected)
+        self.assertEqual(self._search_ids("Garcíañ,  Juan"), expected)
+
+    def test_domain_and_limit(self):
+        self.assertEqual(
+            self._search_ids("juan garcíañ", [("id", "!=", self.exact.id)], limit=1),
+            [self.prefix.id],
+        )
+
+    def test_single_word(self):
+        self.assertIn(self.other.id, self._search_ids("Flanker"))
+
+    def test_fallback(self):
+        """Names not found in the split fields use the standard search."""
+        company = self.env["res.partner"].create(
+            {"name": "Flanker Corp", "is_company": True}
+        )
+        self.other.parent_id = company
+        self.assertEqual(self._search_ids("Corp, Juan"), [self.other.id])
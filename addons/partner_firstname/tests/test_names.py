@@ -0,0 +1,57 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+"""Test the ORM-free name splitter."""
+
+from odoo.tests import BaseCase
+
+from .. import names
+
+
+class NamesCase(BaseCase):
+    def test_clean_whitespace(self):
+        self.assertEqual(
+            names.clean_whitespace_many(
+                ["  Petër   Flanker ", b"P\xc3\xa9ter  Flanker", "", False]
+            ),
+            ["Petër Flanker", "Péter Flanker", "", False],
+        )
+        self.assertEqual(
+            names.clean_whitespace(" Flanker ,  Petër", comma=True), "Flanker,Petër"
+        )
+
+    def test_split_names(self):
+        cases = (
+            ("first_last", "Petër  García Lorca", ("García Lorca", "Petër")),
+            ("last_first", "García Lorca Petër", ("García", "Lorca Petër")),
+            ("last_first_comma", "García Lorca , Petër", ("García Lorca", "Petër")),
+        )
+        for order, name, (lastname, firstname) in cases:
+            self.assertEqual(
+                names.split_names(
+                    [name, "Mönty", "", "ACME  Corp"], [0, 0, 0, 1], order
+                ),
+                [
+                    {"lastname": lastname, "firstname": firstname},
+                    {"lastname": "Mönty", "firstname": False},
+                    {"lastname": False, "firstname": False},
+                    {"lastname": "ACME  Corp", "firstname": False},
+                ],
+            )
+
+    def test_join_names(self):
+        parts = [("García Lorca", "Federico"), ("Flanker", False)]
+        self.assertEqual(
+            names.join_names(parts, "last_first_comma"),
+            ["García Lorca, Federico", "Flanker"],
+        )
+        self.assertEqual(
+            names.join_names(parts, "first_last"),
+            ["Federico García Lorca", "Flanker"],
+        )
+
+    def test_split_join_roundtrip(self):
+        for order in ("first_last", "last_first", "last_first_comma"):
+            full_name = names.join_name("Flanker", "Petër", order)
+            self.assertEqual(
+                names.split_name(full_name, order=order),
+                {"lastname": "Flanker", "firstname": "Petër"},
+            )
@@ -1,6 +1,8 @@
 # Copyright 2015 Antiun Ingenieria S.L. - Antonio Espinosa
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
+from unittest.mock import patch
+
 from odoo.tests import TransactionCase
 
 
@@ -36,3 +38,25 @@ class PartnerNamesOrder(TransactionCase):
             result = self.env["res.partner"]._get_inverse_name(name)
             self.assertEqual(result["lastname"], lastname)
             self.assertEqual(result["firstname"], firstname)
+
+    def test_names_order_change_is_picked_up(self):
+        partner_model = self.env["res.partner"]
+        for order in ("last_first", "first_last", "last_first_comma"):
+            self.order_set(order)
+            self.assertEqual(partner_model._get_names_order(), order)
+
+    def test_names_order_resolved_once_per_inverse(self):
+        partners = self.env["res.partner"].create(
+            [{"firstname": f"Petër{i}", "lastname": "Flanker"} for i in range(5)]
+        )
+        with patch.object(
+            type(partners),
+            "_get_names_order",
+            autospec=True,
+            return_value="last_first",
+        ) as get_names_order:
+            partners._compute_name()
+            self.assertEqual(partners[0].name, "Flanker Petër0")
+            get_names_order.reset_mock()
+            partners._inverse_name()
+            self.assertEqual(get_names_order.call_count, 1)
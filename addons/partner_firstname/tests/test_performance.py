@@ -0,0 +1,107 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+"""Query and time budgets of the bulk operations on partner names.
+
+Budgets are expressed per partner, well under one query each, so that any
+operation falling back to per-record SQL fails. Run them alone with
+``--test-tags /partner_firstname:partner_firstname_perf``.
+"""
+
+import time
+from contextlib import contextmanager
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install", "partner_firstname_perf")
+class PerformanceCase(TransactionCase):
+    partner_count = 2000
+    # Maximum queries per processed partner, and fixed overhead
+    queries_per_partner = 0.1
+    queries_overhead = 50
+    # Maximum seconds per operation
+    time_budget = 30
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(
+            context=dict(cls.env.context, tracking_disable=True, mail_create_nolog=True)
+        )
+        cls.partner_model = cls.env["res.partner"]
+
+    def _vals_list(self, count=None):
+        return [
+            {"name": f"Petër{i} Flanker{i % 97}"}
+            for i in range(count or self.partner_count)
+        ]
+
+    @contextmanager
+    def assertBudget(self, partner_count):
+        """Check queries and wall time of processing ``partner_count`` partners."""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        budget = int(partner_count * self.queries_per_partner) + self.queries_overhead
+        started = time.perf_counter()
+        with self.assertQueryCount(budget):
+            yield
+            self.env.flush_all()
+        self.assertLess(time.perf_counter() - started, self.time_budget)
+
+    def test_create(self):
+        with self.assertBudget(self.partner_count):
+            partners = self.partner_model.create(self._vals_list())
+        self.assertEqual(
+            partners[-1].lastname, f"Flanker{(self.partner_count - 1) % 97}"
+        )
+
+    def test_create_name_parts(self):
+        vals_list = [
+            {"firstname": f"Petër{i}", "lastname": "Flanker"}
+            for i in range(self.partner_count)
+        ]
+        with self.assertBudget(self.partner_count):
+            self.partner_model.create(vals_list)
+
+    def test_inverse_name(self):
+        partners = self.partner_model.create(self._vals_list())
+        self.env.flush_all()
+        # New names whose parts are still to be split and written
+        self.env.cr.execute(
+            """UPDATE res_partner
+            SET name = 'Flanker ' || id, firstname = NULL, lastname = NULL
+            WHERE id IN %s""",
+            (tuple(partners.ids),),
+        )
+        with self.assertBudget(self.partner_count):
+            partners._inverse_name()
+        self.assertEqual(partners[0].lastname, str(partners[0].id))
+
+    def test_copy(self):
+        partners = self.partner_model.create(self._vals_list(200))
+        self.env.flush_all()
+        started = time.perf_counter()
+        for partner in partners:
+            # Copying is per record; bound the cost of a single copy
+            with self.assertQueryCount(40):
+                partner.copy()
+        self.assertLess(time.perf_counter() - started, self.time_budget)
+
+    def test_recalculate_partners_name(self):
+        self.partner_model.create(self._vals_list())
+        config = self.env["res.config.settings"].create(
+            {"partner_names_order": "last_first_comma"}
+        )
+        partner_count = len(config._partners_for_recalculating())
+        with self.assertBudget(partner_count):
+            config.action_recalculate_partners_name()
+
+    def test_install_partner_firstname(self):
+        partners = self.partner_model.create(self._vals_list())
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE res_partner SET firstname = NULL, lastname = NULL WHERE id IN %s",
+            (tuple(partners.ids),),
+        )
+        with self.assertBudget(self.partner_count):
+            self.partner_model._install_partner_firstname()
+        self.assertEqual(partners[0].firstname, "Petër0")